@@ -0,0 +1,53 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+import re
+import time
+from Crypto.Util.number import long_to_bytes
+from saga.lattice import small_roots
+from saga.nt import invert
+
+p = 0x31337313373133731337313373133731337313373133731337313373133732ad
+a = 0xdeadbeefdeadbeefdeadbeefdeadbeefdeadbeefdeadbeefdeadbeefdeadbeef
+b = 0xdeadc0dedeadc0dedeadc0dedeadc0dedeadc0dedeadc0dedeadc0dedeadc0de
+trunc = 48
+
+
+def solve(instance):
+    # older instances call the hints hint1/hint2
+    values = dict(re.findall(r"(\w+) = (\d+)", instance))
+    H1 = int(values.get("res1") or values["hint1"]) << trunc
+    H2 = int(values.get("res2") or values["hint2"]) << trunc
+
+    # s_i = A_i * x + B_i, and h1 = s1 / s2, h2 = s3 / s4 (mod p)
+    A = [pow(a, i, p) for i in range(5)]
+    B = [b * sum(A[:i]) % p for i in range(5)]
+
+    # s1 - (H1 + y1) * s2 = P1 * x + Q1, with P1 and Q1 linear in y1; same for y2
+    P1 = (A[1] - H1 * A[2], -A[2])
+    Q1 = (B[1] - H1 * B[2], -B[2])
+    P2 = (A[3] - H2 * A[4], -A[4])
+    Q2 = (B[3] - H2 * B[4], -B[4])
+
+    # eliminating x leaves P1 * Q2 - P2 * Q1 = 0, bilinear in (y1, y2)
+    f = {
+        (0, 0): P1[0] * Q2[0] - P2[0] * Q1[0],
+        (1, 0): P1[1] * Q2[0] - P2[0] * Q1[1],
+        (0, 1): P1[0] * Q2[1] - P2[1] * Q1[0],
+        (1, 1): P1[1] * Q2[1] - P2[1] * Q1[1],
+    }
+    lead = invert(f[1, 1], p)
+    f = {e: c * lead % p for e, c in f.items()}
+
+    y1, y2 = small_roots(f, p, 1 << trunc, 1 << trunc)[0]
+
+    x = -(Q1[0] + Q1[1] * y1) * invert(P1[0] + P1[1] * y1, p) % p
+    state = long_to_bytes(x)
+    return state[:state.index(b"}") + 1]
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    flag = solve(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output.txt")).read())
+    print(f"solved in {time.perf_counter() - start:.3f}s")
+    print(flag)
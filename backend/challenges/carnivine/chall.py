@@ -1,28 +1,72 @@
-from Crypto.Util.number import getPrime
+import sys
 
-e = 65537
-p, q = getPrime(512), getPrime(512)
-n = p * q
-d = pow(e, -1, (p-1)*(q-1))
+try:
+    from saga.governor import limits
+    from saga.nt import powmod
+    from saga.primes import getPrime
+    from saga.rsa import RSAKey
+    from saga.session import run_stdio
+except ImportError:
+    # the handout on its own: the same session on plain input() and print()
+    from Crypto.Util.number import getPrime
+    powmod = pow
+
+    def limits(**kwargs):
+        return lambda session: session
+
+    class RSAKey:
+        def __init__(self, p, q, e):
+            self.e = e
+            self.n = p * q
+            self.d = pow(e, -1, (p - 1) * (q - 1))
+
+        def decrypt(self, c):
+            return pow(c, self.d, self.n)
+
+    class StdioSession:
+        print = staticmethod(print)
+
+        async def input(self, prompt=""):
+            return input(prompt)
+
+    def run_stdio(session):
+        try:
+            session(StdioSession()).send(None)
+        except StopIteration as stop:
+            sys.exit(stop.value)
 
+e = 65537
 FLAG = open('flag.txt', 'rb').read().strip()
-cFLAG = pow(int.from_bytes(FLAG, 'big'), e, n)
-
-print("Carnivine challenges you...")
-print("n =", n)
-print("c =", cFLAG)
-
-while True:
-    try:
-        print("Carnivine offers to decrypt...")
-        c = int(input('Ciphertext: '))
-        m = pow(c, d, n).to_bytes(n.bit_length() // 8, 'big')
-        print("Carnivine refuses to decrypt...\n")
-    except KeyboardInterrupt:
-        print("Carnivine faints...")
-        break
-    except:
-        print('Carnivine feels sick...\n')
+
+# length probes plus a 16-ary search over ~1000 bits
+@limits(queries=8192, cpu_s=20, idle_s=120)
+async def session(io):
+    p, q = getPrime(512), getPrime(512)
+    key = RSAKey(p, q, e)
+    n = key.n
+
+    cFLAG = powmod(int.from_bytes(FLAG, 'big'), e, n)
+
+    io.print("Carnivine challenges you...")
+    io.print("n =", n)
+    io.print("c =", cFLAG)
+
+    while True:
+        try:
+            io.print("Carnivine offers to decrypt...")
+            c = int(await io.input('Ciphertext: '))
+            m = key.decrypt(c).to_bytes(n.bit_length() // 8, 'big')
+            io.print("Carnivine refuses to decrypt...\n")
+        except KeyboardInterrupt:
+            io.print("Carnivine faints...")
+            break
+        except EOFError:
+            break
+        except Exception:
+            io.print('Carnivine feels sick...\n')
+
+if __name__ == "__main__":
+    run_stdio(session)
 
 
 # Challenge: Carnivine
@@ -1,31 +1,57 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
 from Crypto.Util.number import long_to_bytes
 from pwn import *
+from saga.nt import powmod
+from saga.oracle import PipelinedOracle, kary_search
+from saga.transcript import process
 
-def send_to_oracle(c):
-    io.sendlineafter(b"Ciphertext: ", str(c).encode())
-    res = io.recvline()
+# probes per search round is K - 1; override with `python3 solve.py K=32`
+K = int(args.K or 16)
 
-    if b"Carnivine refuses to decrypt..." in res:
+def decode_reply(res):
+    if res == b"Carnivine refuses to decrypt...":
         return 0
-    return 1
+    if res == b"Carnivine feels sick...":
+        return 1
+    raise ValueError(res)
+
+def connect():
+    io = process(["python3", "chall.py"])
+    io.recvuntil(b"n = ")
+    n = int(io.recvline().decode())
+    io.recvuntil(b"c = ")
+    c = int(io.recvline().decode())
+    return io, n, c
 
-io = process(["python3", "chall.py"])
-io.recvuntil(b"n = ")
-n = int(io.recvline().decode())
-io.recvuntil(b"c = ")
-c = int(io.recvline().decode())
+# when n is a whole number of bytes every decryption fits in
+# n.bit_length() // 8 bytes and the oracle never answers, so such
+# instances are thrown back
+io, n, c = connect()
+while n.bit_length() % 8 == 0:
+    io.close()
+    io, n, c = connect()
 e = 65537
 
 print("n =", n)
 print("c =", c)
 
+oracle = PipelinedOracle(
+    io,
+    encode=lambda c: str(c).encode() + b"\n",
+    decode=decode_reply,
+    lead=b"Carnivine offers to decrypt...\nCiphertext: ",
+    tail=b"\n",
+)
 max_bytes = n.bit_length() // 8
+# all length probes go out up front; replies past the first hit are
+# drained unread by the next batch
+shifts = (c * powmod(2**(8*shift), e, n) % n for shift in range(1, max_bytes + 1))
 shift = 0
-while shift < max_bytes:
-    shift += 1
-    res = send_to_oracle(c * pow(2**(8*shift), e, n) % n)
+for shift, res in enumerate(oracle.stream(shifts), 1):
     if res:
-        break 
+        break
 flag_length = max_bytes - shift + 1
 print("Flag length:", flag_length, max_bytes)
 
@@ -34,12 +60,7 @@ if flag_length <= 1:
 
 low = 2**(8*(max_bytes - flag_length))
 high = 2**(8*(max_bytes - flag_length + 1))
-while low <= high:
-    mid = low + (high - low) // 2
-    if send_to_oracle(c * pow(mid, e, n) % n):
-        high = mid - 1
-    else:
-        low = mid + 1
+low = kary_search(oracle, low, high, lambda mid: c * powmod(mid, e, n) % n, k=K)
 max_num = low - 1
 print("Max number: ", max_num)
 print("Message: ", long_to_bytes(2**(8*max_bytes) // max_num))
\ No newline at end of file
@@ -1,12 +1,59 @@
+import sys
 from Crypto.Util.number import *
 
+try:
+    from saga.governor import limits
+    from saga.metrics import timed
+    from saga.primes import getPrime
+    from saga.rsa import RSAKey
+    from saga.session import run_stdio
+except ImportError:
+    # the handout on its own: the same session on plain input() and print()
+    import contextlib
+
+    def limits(**kwargs):
+        return lambda session: session
+
+    class timed(contextlib.ContextDecorator):
+        def __init__(self, name):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+    class RSAKey:
+        def __init__(self, p, q, e):
+            self.e = e
+            self.n = p * q
+            self.d = pow(e, -1, (p - 1) * (q - 1))
+
+        def encrypt(self, m):
+            return pow(m, self.e, self.n)
+
+        def decrypt(self, c):
+            return pow(c, self.d, self.n)
+
+    class StdioSession:
+        print = staticmethod(print)
+
+        async def input(self, prompt=""):
+            return input(prompt)
+
+    def run_stdio(session):
+        try:
+            session(StdioSession()).send(None)
+        except StopIteration as stop:
+            sys.exit(stop.value)
+
 class ClawRNG:
     def __init__(self):
         self.p = getPrime(8)
         self.q = getPrime(8)
         self.M = self.p * self.q
         self.x = getPrime(15)
-        print(f"Crawdaunt grants you a gift: M = {self.M}")
 
     def get_bit(self):
         self.x = pow(self.x, 2, self.M)
@@ -17,17 +64,18 @@ class ClawOracle:
         self.rng = rng
         self.p = getPrime(512)
         self.q = getPrime(512)
-        self.n = self.p * self.q
         self.e = 65537
-        self.phi = (self.p - 1) * (self.q - 1)
-        self.d = pow(self.e, -1, self.phi)
+        self.key = RSAKey(self.p, self.q, self.e)
+        self.n = self.key.n
+        self.d = self.key.d
 
     def encrypt(self, m):
-        return pow(m, self.e, self.n)
+        return self.key.encrypt(m)
 
     def decrypt(self, c):
-        return pow(c, self.d, self.n)
+        return self.key.decrypt(c)
 
+    @timed("crawdaunt.claw_oracle")
     def claw_oracle(self, c):
         randbit = self.rng.get_bit()
         result = self.decrypt(c)
@@ -36,27 +84,34 @@ class ClawOracle:
 
 FLAG = bytes_to_long(open("flag.txt", "rb").read())
 
-print("Crawdaunt challenges you...")
-clawRNG = ClawRNG()
-clawOracle = ClawOracle(clawRNG)
-chances = 1500
-
-while chances > 0:
-    print("\nCrawdaunt Claw Oracle System")
-    print("1. Encrypt the flag")
-    print("2. Decrypt a message")
-    print("3. Surrender")
-    choice = int(input("> "))
-
-    if choice == 1:
-        print("Crawdaunt grants you: n =", clawOracle.n)
-        print("Crawdaunt grants you:", clawOracle.encrypt(FLAG))
-    elif choice == 2:
-        c = int(input("Ciphertext: "), 16)
-        print("Crawdaunt grants you:", clawOracle.claw_oracle(c))
-    else:
-        break
-    chances -= 1
+# `chances` already caps the rounds
+@limits(cpu_s=10, idle_s=120)
+async def session(io):
+    io.print("Crawdaunt challenges you...")
+    clawRNG = ClawRNG()
+    io.print(f"Crawdaunt grants you a gift: M = {clawRNG.M}")
+    clawOracle = ClawOracle(clawRNG)
+    chances = 1500
+
+    while chances > 0:
+        io.print("\nCrawdaunt Claw Oracle System")
+        io.print("1. Encrypt the flag")
+        io.print("2. Decrypt a message")
+        io.print("3. Surrender")
+        choice = int(await io.input("> "))
+
+        if choice == 1:
+            io.print("Crawdaunt grants you: n =", clawOracle.n)
+            io.print("Crawdaunt grants you:", clawOracle.encrypt(FLAG))
+        elif choice == 2:
+            c = int(await io.input("Ciphertext: "), 16)
+            io.print("Crawdaunt grants you:", clawOracle.claw_oracle(c))
+        else:
+            break
+        chances -= 1
+
+if __name__ == "__main__":
+    run_stdio(session)
 
 
 # Challenge: Crawdaunt
@@ -1,16 +1,19 @@
-from Crypto.Util.number import isPrime, long_to_bytes
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from Crypto.Util.number import long_to_bytes
 from pwn import *
+from saga.bbs import BBSTable
+from saga.nt import is_prime, powmod
+from saga.oracle import PipelinedOracle
+from saga.transcript import process
 
-def send_to_oracle(m):
+def encode_query(m):
     m = hex(m)[2:]
     if len(m) % 2 == 1:
         m = m.zfill(len(m) + 1)
 
-    io.sendlineafter(b"> ", b"2")
-    io.sendlineafter(b": ", m.encode())
-    io.recvuntil(b": ")
-
-    return int(io.recvline().decode())
+    return b"2\n" + m.encode() + b"\n"
 
 def stateBitGen(x, M):
     while True:
@@ -33,57 +36,60 @@ print("M =", M)
 print("n =", n)
 print("c =", c)
 
-MAX_ITER = 50
-context.log_level = "info"
-x0_bits = []
-for i in range(MAX_ITER):
-    x0_bits.append(int(not send_to_oracle(1)))
-print(x0_bits)
+oracle = PipelinedOracle(
+    io,
+    encode=encode_query,
+    decode=int,
+    lead=b"\nCrawdaunt Claw Oracle System\n1. Encrypt the flag\n2. Decrypt a message\n3. Surrender\n> Ciphertext: Crawdaunt grants you: ",
+)
 
 possible_primes = []
 for i in range(2**14, 2**15-1):
-    if isPrime(i):
+    if is_prime(i):
         possible_primes.append(i)
 
-valid_x0s = []
-for valid_prime in possible_primes:
-    x = valid_prime
-    res_x0_bits = []
-    for i in range(MAX_ITER):
-        x = pow(x, 2, M)
-        res_x0_bits.append(x % 2)
-    if res_x0_bits == x0_bits:
-        print("x0 =", valid_prime)
-        valid_x0s.append(valid_prime)
+# Shortest prefix that pins down the generator state for every seed
+table = BBSTable(M, possible_primes)
+MAX_ITER = table.prefix_length() or table.length
+print("Sync bits:", MAX_ITER)
 
-if len(valid_x0s) != 1:
+context.log_level = "info"
+x0_bits = [int(not res) for res in oracle.query_many([1] * MAX_ITER)]
+print(x0_bits)
+
+try:
+    state = table.lookup(x0_bits)
+except (KeyError, ValueError):
     print("Restart: requires only one x0!")
     exit()
+print("x =", state)
 
-bitgen = stateBitGen(valid_x0s[0], M)
-for i in range(MAX_ITER):
-    next(bitgen)
+bitgen = stateBitGen(state, M)
 
 nextbits = []
 for i in range(10):
     nextbits.append(next(bitgen))
 
-x0_bits = []
-for i in range(10):
-    x0_bits.append(int(not send_to_oracle(1)))
+x0_bits = [int(not res) for res in oracle.query_many([1] * 10)]
 print("Bits aligned:", nextbits == x0_bits)
 
 e = 65537
 upper_limit = n
 lower_limit = 0
 
-i = 0
-while lower_limit < upper_limit:
-    if next(bitgen):
-        res = send_to_oracle(c * pow(2**i, e, n) % n)
-    else:
-        res = send_to_oracle(c * pow(2**(i+1), e, n) % n)
+def queries():
+    # The oracle type of every round is already known from bitgen, so the
+    # whole search can be queued without waiting for any reply.
+    i = 0
+    while True:
+        if next(bitgen):
+            yield c * powmod(2**i, e, n) % n
+        else:
+            yield c * powmod(2**(i+1), e, n) % n
+        i += 1
 
+i = 0
+for res in oracle.stream(queries()):
     if res:
         lower_limit = (lower_limit + upper_limit)//2
     else:
@@ -91,9 +97,11 @@ while lower_limit < upper_limit:
 
     i += 1
     print(i, long_to_bytes(lower_limit))
+    if lower_limit >= upper_limit:
+        break
 
 for i in range(-50, 50):
     m = lower_limit + i
-    if pow(m, e, n) == c:
+    if powmod(m, e, n) == c:
         print(long_to_bytes(m))
         break
\ No newline at end of file
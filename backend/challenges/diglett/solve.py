@@ -0,0 +1,26 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+import time
+from Crypto.Util.number import long_to_bytes
+from saga.poly import from_terms, integer_roots, resultant, specialize
+
+
+def solve(instance):
+    res1, res2 = map(int, instance.split())
+
+    # polynomials in (m1, m2), keyed by (deg m1, deg m2)
+    f1 = from_terms({(0, 2): 13, (1, 1): 1, (7, 0): 5, (0, 0): -res1})
+    f2 = from_terms({(0, 3): 7, (5, 0): 1, (0, 0): -res2})
+
+    f3 = resultant(f1, f2)
+    m1 = max(integer_roots(f3))
+    m2 = max(integer_roots(specialize(f1, m1)))
+    return long_to_bytes(m1) + long_to_bytes(m2)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    flag = solve(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output.txt")).read())
+    print(f"m1, m2 recovered in {time.perf_counter() - start:.3f}s")
+    print(flag)
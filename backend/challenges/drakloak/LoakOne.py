@@ -1,40 +1,48 @@
-p = 3711307719289846942219567023821864189758609249064872089779
+try:
+    from saga.nt import mpz
+    from saga.scalarmul import Comb, window_pow
+except ImportError:
+    # the handout on its own: plain ints, double-and-add and no tables
+    mpz = int
+    Comb = None
+
+    def window_pow(op, base, n, identity):
+        result = identity
+        while n > 0:
+            if n & 1:
+                result = op(result, base)
+            base = op(base, base)
+            n >>= 1
+        return result
+
+# an mpz modulus keeps every coordinate in gmpy2 when it is installed
+p = mpz(3711307719289846942219567023821864189758609249064872089779)
 
 class LoakOne:
     class LoakOneElement:
+        __slots__ = ("parent", "x", "y", "table")
+
         def __init__(self, parent, x, y):
             self.parent = parent
             self.x = x
             self.y = y
+            self.table = None
 
         def __add__(self, other):
-            a = self.parent.a
-            b = self.parent.b
-
-            x0, y0 = self.x, self.y
-            x1, y1 = other.x, other.y
-            
-            A = x0 * x1 % p
-            B = x0 * y1 % p
-            C = y0 * x1 % p
-            D = y0 * y1 % p
-            E = (A - b * D) % p
-            F = (B + C - a * D) % p
-
-            return self.parent(E, F)
+            return self.parent(*self.parent.add_raw((self.x, self.y), (other.x, other.y)))
 
         def __mul__(self, n):
-            result = self.parent(1, 0)
-            base = self
-            while n > 0:
-                if n % 2 == 1:
-                    result = result + base
-                base = base + base
-                n //= 2
-            return result
+            if self.table is not None:
+                return self.parent(*self.table.pow(n))
+            return self.parent(*self.parent.mul_raw((self.x, self.y), n))
         
         def __rmul__(self, n):
             return self.__mul__(n)
+
+        def precompute(self):
+            if self.table is None and Comb is not None:
+                self.table = Comb(self.parent.add_raw, (self.x, self.y), p.bit_length(), self.parent.identity)
+            return self
         
         def list(self):
             return [self.x, self.y]
@@ -42,6 +50,20 @@ class LoakOne:
     def __init__(self, a, b):
         self.a = a
         self.b = b
+        self.identity = (1, 0)
 
     def __call__(self, x, y):
-        return LoakOne.LoakOneElement(self, x, y)
\ No newline at end of file
+        return LoakOne.LoakOneElement(self, x, y)
+
+    def add_raw(self, P, Q):
+        x0, y0 = P
+        x1, y1 = Q
+
+        D = y0 * y1 % p
+        E = (x0 * x1 - self.b * D) % p
+        F = (x0 * y1 + y0 * x1 - self.a * D) % p
+
+        return E, F
+
+    def mul_raw(self, P, n):
+        return window_pow(self.add_raw, P, n, self.identity)
@@ -1,61 +1,66 @@
-from Crypto.Util.number import inverse
 from Crypto.Random.random import randint
 
+try:
+    from saga.nt import invert, legendre as legendre_symbol, mpz, powmod
+    from saga.scalarmul import Comb, window_pow
+except ImportError:
+    # the handout on its own: plain ints, double-and-add and no tables
+    mpz = int
+    powmod = pow
+    Comb = None
+
+    def invert(a, m):
+        return pow(a, -1, m)
+
+    def legendre_symbol(a, m):
+        s = pow(a, (m - 1) // 2, m)
+        return -1 if s == m - 1 else s
+
+    def window_pow(op, base, n, identity):
+        result = identity
+        while n > 0:
+            if n & 1:
+                result = op(result, base)
+            base = op(base, base)
+            n >>= 1
+        return result
+
 def ez_sqrt(x) :
-    return pow(x, (p + 1) // 4, p)
+    return powmod(x, (p + 1) // 4, p)
 
 def legendre(x) :
-    return pow(x, (p - 1) // 2, p)
+    # p - 1 rather than -1 for a non-residue, as Euler's criterion gives
+    return legendre_symbol(x, p) % p
 
 DD = 119
-p = 3711307719289846942219567023821864189758609249064872089779
+# an mpz modulus keeps every coordinate in gmpy2 when it is installed
+p = mpz(3711307719289846942219567023821864189758609249064872089779)
 
 class LoakTwo:
     class LoakTwoElement:
+        __slots__ = ("parent", "x", "y", "table")
+
         def __init__(self, parent, x, y):
             self.parent = parent
             self.x = x
             self.y = y
+            self.table = None
 
         def __add__(self, other):
-            a = self.parent.a
-            b = self.parent.b
-
-            x1, y1 = self.x, self.y
-            x2, y2 = other.x, other.y
-
-            ab = a * b % p
-            ab2 = ab * ab % p
-            abrec = inverse(ab, p) % p
-            ab2rec = inverse(ab2, p) % p
-
-            A = x1 * x2 % p
-            B = x1 * y2 % p
-            C = x2 * y1 % p
-            D = y1 * y2 % p
-            
-            E = ab * A % p
-            F = D * abrec % p
-            G = DD * F * ab2rec % p
-            H = ab * (B + C) % p
-
-            X = (E - F + G) % p
-            Y = (H + 2*D) % p
-
-            return self.parent(X, Y)
+            return self.parent(*self.parent.add_raw((self.x, self.y), (other.x, other.y)))
 
         def __mul__(self, n):
-            result = self.parent(inverse(self.parent.a * self.parent.b, p), 0)
-            base = self
-            while n > 0:
-                if n % 2 == 1:
-                    result = result + base
-                base = base + base
-                n //= 2
-            return result
+            if self.table is not None:
+                return self.parent(*self.table.pow(n))
+            return self.parent(*self.parent.mul_raw((self.x, self.y), n))
         
         def __rmul__(self, n):
             return self.__mul__(n)
+
+        def precompute(self):
+            if self.table is None and Comb is not None:
+                self.table = Comb(self.parent.add_raw, (self.x, self.y), p.bit_length(), self.parent.identity)
+            return self
         
         def list(self):
             return [self.x, self.y]
@@ -63,28 +68,65 @@ class LoakTwo:
     def __init__(self, a, b):
         self.a = a
         self.b = b
+        # Every addition shares 1/(ab) and 1/(ab)^2, so they are folded
+        # into two constants here and add_raw never inverts.
+        self.ab = a * b % p
+        abrec = invert(self.ab, p)
+        self.kD = abrec * (DD * abrec * abrec - 1) % p
+        self.identity = (abrec, 0)
+        # lift_x: disc = B^2 - 4AC reduces to 4 * (DD * x^2 + A) and A is
+        # fixed per parent, so 1/(2A) is computed once as well.
+        self.A = (1 - DD * abrec * abrec) % p
+        self.inv2A = invert(2 * self.A, p)
 
     def __call__(self, x, y):
         return LoakTwo.LoakTwoElement(self, x, y)
+
+    def add_raw(self, P, Q):
+        x1, y1 = P
+        x2, y2 = Q
+
+        D = y1 * y2 % p
+        X = (self.ab * (x1 * x2) + self.kD * D) % p
+        Y = (self.ab * (x1 * y2 + x2 * y1) + 2*D) % p
+
+        return X, Y
+
+    def mul_raw(self, P, n):
+        return window_pow(self.add_raw, P, n, self.identity)
+
+    def lift_x_many(self, xs):
+        """Lift each x in ``xs``, with None where no point exists.
+
+        The square root doubles as the residuosity test (p = 3 mod 4), so
+        each candidate costs a single exponentiation.
+        """
+        ab, A4, inv2A, e = self.ab, 4 * self.A, self.inv2A, (p + 1) // 4
+        out = []
+        for x in xs:
+            disc = (4 * DD * x * x + A4) % p
+            discq = pow(disc, e, p)
+            if disc == 0 or discq * discq % p != disc:
+                out.append(None)
+                continue
+            y = (discq - 2 * ab * x) * inv2A % p
+            out.append(self(x, y))
+        return out
     
     def lift_x(self, x) :
-        a, b = self.a, self.b
-        invAB = inverse(a * b, p)
-        A = - DD * invAB**2 + 1
-        B = 2*a*b*x
-        C = a**2 * b**2 * x**2 - 1
-
-        disc = B**2 - 4 * A * C
-        if legendre(disc) != 1 :
-            return None
-        
-        discq = ez_sqrt(disc)
-        y = ((-B + discq) * inverse(2 * A, p)) % p
-        return self(x, y)
+        return self.lift_x_many([x])[0]
+
+    def random_elements(self, k, batch=None):
+        """Sample ``k`` points, drawing candidates ``batch`` at a time.
+
+        About half of all x lift to a point, so by default each round
+        draws two candidates per point still missing.
+        """
+        points = []
+        while len(points) < k:
+            xs = [randint(1, int(p) - 1) for _ in range(batch or 2 * (k - len(points)))]
+            points.extend(G for G in self.lift_x_many(xs) if G is not None)
+        return points[:k]
     
     def random_element(self) :
-        G = None
-        while G == None :
-            x = randint(1, p - 1)
-            G = self.lift_x(x)
-        return G
\ No newline at end of file
+        return self.random_elements(1)[0]
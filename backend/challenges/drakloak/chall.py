@@ -1,17 +1,48 @@
+import sys
 from Crypto.Random import random
 from LoakOne import LoakOne
 from LoakTwo import LoakTwo
 import json
 
+try:
+    from saga.metrics import timed
+    from saga.session import run_stdio
+except ImportError:
+    # the handout on its own: the same session on plain input() and print()
+    import contextlib
+
+    class timed(contextlib.ContextDecorator):
+        def __init__(self, name):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+    class StdioSession:
+        print = staticmethod(print)
+
+        async def input(self, prompt=""):
+            return input(prompt)
+
+    def run_stdio(session):
+        try:
+            session(StdioSession()).send(None)
+        except StopIteration as stop:
+            sys.exit(stop.value)
+
 FLAG = open('flag.txt', 'r').read()
 p = 3711307719289846942219567023821864189758609249064872089779
 
 class LoakRNG:
     def __init__(self, seed, P, Q):
         self.seed = seed
-        self.P = P
-        self.Q = Q
+        self.P = P.precompute()
+        self.Q = Q.precompute()
 
+    @timed("drakloak.loak_next")
     def next(self):
         t = self.seed
         s = (t * self.P).x
@@ -19,49 +50,52 @@ class LoakRNG:
         r = (s * self.Q).x
         return (int(r)) >> 12
 
-send = lambda x : print(json.dumps(x))
-recv = lambda : json.loads(input())
+async def session(io):
+    send = lambda x : io.print(json.dumps(x))
+
+    loakCoins = 5000
+    a1, a2, b2 = [random.randint(1, p) for i in range(3)]
 
-loakCoins = 5000
-a1, a2, b2 = [random.randint(1, p) for i in range(3)]
+    E2 = LoakTwo(a2, b2)
+    G2 = E2.random_element()
 
-E2 = LoakTwo(a2, b2)
-G2 = E2.random_element()
+    io.print("Drakloak challenges you...")
+    io.print("Drakloak demands b1 and a point of E1!")
+    send({"a1" : a1, "a2" : a2, "b2" : b2, "Gx" : int(G2.x), "Gy" : int(G2.y)})
+    response = json.loads(await io.input())
 
-print("Drakloak challenges you...")
-print("Drakloak demands b1 and a point of E1!")
-send({"a1" : a1, "a2" : a2, "b2" : b2, "Gx" : G2.x, "Gy" : G2.y})
-response = recv()
+    b1 = response['b1']
+    x1, y1 = response['x'] % p, response['y'] % p
 
-b1 = response['b1']
-x1, y1 = response['x'] % p, response['y'] % p
+    E1 = LoakOne(a1, b1)
+    G1 = E1(x1, y1)
 
-E1 = LoakOne(a1, b1)
-G1 = E1(x1, y1)
+    if (195306067165045895827288868805553560 * G1).list() == [1, 0] or x1 == 0 or y1 == 0:
+        io.print("Drakloak rejects the point!")
+        return
 
-if (195306067165045895827288868805553560 * G1).list() == [1, 0] or x1 == 0 or y1 == 0:
-    print("Drakloak rejects the point!")
-exit()
+    rand = LoakRNG(random.randint(1, p), G1, G2)
+    maxCoins = 12000
 
-rand = LoakRNG(random.randint(1, p), G1, G2)
-maxCoins = 12000
+    while 0 < loakCoins < maxCoins:
+        nextLoak = rand.next()
+        response = json.loads(await io.input())
 
-while 0 < loakCoins < maxCoins:
-    nextLoak = rand.next()
-response = recv()
+        if response['nextLoak'] != nextLoak :
+            send({"message": "Your loak is fake...", "nextLoak" : nextLoak})
+            loakCoins -= 1000
+        elif response['nextLoak'] == nextLoak :
+            send({"nextLoak" : nextLoak})
+            loakCoins += 400
 
-if response['nextLoak'] != nextLoak :
-    send({"message": "Your loak is fake...", "nextLoak" : nextLoak})
-    loakCoins -= 1000
-elif response['nextLoak'] == nextLoak :
-    send({"nextLoak" : nextLoak})
-    loakCoins += 400
+    if loakCoins <= 0:
+        io.print("Drakloak runs away...")
+    elif loakCoins >= maxCoins:
+        io.print("Drakloak approves of you!")
+        io.print("Drakloak grants you", FLAG)
 
-if loakCoins <= 0:
-    print("Drakloak runs away...")
-elif loakCoins >= maxCoins:
-    print("Drakloak approves of you!")
-    print("Drakloak grants you", FLAG)
+if __name__ == "__main__":
+    run_stdio(session)
 
 
 # Challenge: Drakloak
@@ -1,6 +1,48 @@
-import random
+import random, sys
 from ecdsa import ellipticcurve
-from Crypto.Util.number import getPrime, bytes_to_long, long_to_bytes
+from Crypto.Util.number import bytes_to_long, long_to_bytes
+
+try:
+    from saga.metrics import timed
+    from saga.nt import powmod
+    from saga.primes import getPrime
+    from saga.rsa import RSAKey
+    from saga.session import run_stdio
+except ImportError:
+    # the handout on its own: the same session on plain input() and print()
+    import contextlib
+    from Crypto.Util.number import getPrime
+    powmod = pow
+
+    class timed(contextlib.ContextDecorator):
+        def __init__(self, name):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+    class RSAKey:
+        def __init__(self, p, q, e):
+            self.n = p * q
+            self.d = pow(e, -1, (p - 1) * (q - 1))
+
+        def decrypt(self, c):
+            return pow(c, self.d, self.n)
+
+    class StdioSession:
+        print = staticmethod(print)
+
+        async def input(self, prompt=""):
+            return input(prompt)
+
+    def run_stdio(session):
+        try:
+            session(StdioSession()).send(None)
+        except StopIteration as stop:
+            sys.exit(stop.value)
 
 FLAG = open('/tmp/challenges/empoleon/flag.txt', 'rb').read()
 assert(len(FLAG) <= 120)
@@ -11,49 +53,59 @@ b = 2525520505402437178389660503926710183797241905596963639342559026192613119902
 x = 1663255323649316187237502679180020234514169346773977936323045878120391437837
 y = 84006750294604478804216697619398950537391904455312244388797990516611936533488
 curve = ellipticcurve.CurveFp(p, a, b)
-G = ellipticcurve.Point(curve, x, y)
 # q = E.base_ring().order()
 # n = G.order()
+n = 93556643250795678718734474880013829509848977747379500929457472016889767786158
+# Jacobian coordinates with a precomputed table; generator=True needs the order.
+# ecdsa builds the table on the first multiplication, so do one here and
+# zygote children inherit it (G * 1 returns early without building it)
+G = ellipticcurve.PointJacobi(curve, x, y, 1, n, generator=True)
+G * 2
 # for k in range(1, 10):
 #     assert(power_mod(q, k, n) != 1)
 # assert(E.trace_of_frobenius() != 1)
 
-p, q = getPrime(512), getPrime(512)
-N = p * q
-e = 0x10001
-phi = (p-1)*(q-1)
-d = pow(e, -1, phi)
-
-print("Empoleon challenges you...")
-while True:
-    x = bytes_to_long(random.randbytes(16))
-    if x % 2 == 1:
-        break
-Gx = G * x
-
-while True:
-    print("1. Encrypt")
-    print("2. Decrypt")
-    print("3. Flag")
-
-    choice = int(input(">>> "))
-
-    if choice == 1:
-        pt = bytes.fromhex(input("Plaintext (hex): ").strip())
-        pt = bytes_to_long(pt)
-        ct = pow(pt, e * (pt.bit_length() + 1), N)
-        print(long_to_bytes(int(ct)).hex())
-    if choice == 2:
-        ct = bytes.fromhex(input("Ciphertext (hex): ").strip())
-        pt = pow(bytes_to_long(ct), d, N)
-        y = bytes_to_long(random.randbytes(32))
-        Gy = G * y * (x + 1)
-        res = Gy + Gx * pt
-        print(f"({res.x()}, {res.y()})")
-    if choice == 3:
-        pt = bytes_to_long(FLAG)
-        ct = pow(pt, e, N)
-        print(long_to_bytes(int(ct)).hex())
+async def session(io):
+    p, q = getPrime(512), getPrime(512)
+    e = 0x10001
+    key = RSAKey(p, q, e)
+    N = key.n
+
+    io.print("Empoleon challenges you...")
+    while True:
+        x = bytes_to_long(random.randbytes(16))
+        if x % 2 == 1:
+            break
+    Gx = G * x
+
+    while True:
+        io.print("1. Encrypt")
+        io.print("2. Decrypt")
+        io.print("3. Flag")
+
+        choice = int(await io.input(">>> "))
+
+        if choice == 1:
+            pt = bytes.fromhex((await io.input("Plaintext (hex): ")).strip())
+            pt = bytes_to_long(pt)
+            ct = powmod(pt, e * (pt.bit_length() + 1), N)
+            io.print(long_to_bytes(int(ct)).hex())
+        if choice == 2:
+            ct = bytes.fromhex((await io.input("Ciphertext (hex): ")).strip())
+            with timed("empoleon.decrypt"):
+                pt = key.decrypt(bytes_to_long(ct))
+            y = bytes_to_long(random.randbytes(32))
+            # Gy + Gx * pt with Gy = G * y * (x + 1), as one joint multiplication
+            with timed("empoleon.mul_add"):
+                res = G.mul_add(y * (x + 1), Gx, pt)
+            io.print(f"({res.x()}, {res.y()})")
+        if choice == 3:
+            pt = bytes_to_long(FLAG)
+            ct = powmod(pt, e, N)
+            io.print(long_to_bytes(int(ct)).hex())
+
+if __name__ == "__main__":
+    run_stdio(session)
 
 
 # Challenge: Empoleon
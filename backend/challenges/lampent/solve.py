@@ -0,0 +1,37 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+import re
+import time
+from Crypto.Util.number import long_to_bytes
+from saga.gfpoly import add, compose, mul, roots
+from saga.nt import invert, powmod
+
+e = 65537
+
+
+def solve(instance):
+    values = dict(re.findall(r"(\w+) = (\d+)", instance))
+    p, res1, res2 = (int(values[k]) for k in ("p", "res1", "res2"))
+
+    # f2 = 7*m2 + m1^2 - res2 gives m2 = (res2 - m1^2) / 7; put it into
+    # f1 = 13*m2^2 + m1*m2 + 5*m1 - res1 to leave a quartic in m1
+    inv7 = invert(7, p)
+    m2_of_m1 = [res2 * inv7 % p, 0, -inv7 % p]
+    f1 = add(compose([0, 0, 13], m2_of_m1, p), mul([0, 1], m2_of_m1, p), p)
+    f1 = add(f1, [-res1 % p, 5], p)
+
+    d = invert(e, p - 1)
+    for c1 in roots(f1, p):
+        c2 = (res2 - c1 * c1) * inv7 % p
+        flag = long_to_bytes(powmod(c1, d, p)) + long_to_bytes(powmod(c2, d, p))
+        if flag.startswith(b"chrono{"):
+            return flag
+    raise ValueError("no root of the quartic decrypts to a flag")
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    flag = solve(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output.txt")).read())
+    print(f"solved in {time.perf_counter() - start:.3f}s")
+    print(flag)
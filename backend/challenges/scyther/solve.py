@@ -0,0 +1,33 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from Crypto.Util.number import long_to_bytes
+from saga.branch_prune import branch_and_prune
+from saga.nt import invert, powmod
+
+e = 65537
+
+
+def factor(instance):
+    values = {}
+    for line in instance.splitlines():
+        name, _, value = line.partition(" = ")
+        if value:
+            values[name] = int(value)
+    p, q = branch_and_prune(values["n"], values["P"], values["leak1"], values["Q"], values["leak2"], bits=1024)
+    return values, p, q
+
+
+def solve(instance):
+    values, p, q = factor(instance)
+    d = invert(e, (p - 1) * (q - 1))
+    return long_to_bytes(powmod(values["c"], d, values["n"]))
+
+
+if __name__ == "__main__":
+    values, p, q = factor(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output.txt")).read())
+    print("p =", p)
+    print("q =", q)
+
+    d = invert(e, (p - 1) * (q - 1))
+    print(long_to_bytes(powmod(values["c"], d, values["n"])))
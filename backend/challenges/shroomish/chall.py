@@ -1,22 +1,64 @@
-from Crypto.Util.number import bytes_to_long, getPrime
+import sys
+from Crypto.Util.number import bytes_to_long
 
-e = 65537
-p, q = getPrime(512), getPrime(512)
-n = p * q
-d = pow(e, -1, (p-1)*(q-1))
+try:
+    from saga.governor import limits
+    from saga.nt import powmod
+    from saga.primes import getPrime
+    from saga.rsa import RSAKey
+    from saga.session import run_stdio
+except ImportError:
+    # the handout on its own: the same session on plain input() and print()
+    from Crypto.Util.number import getPrime
+    powmod = pow
+
+    def limits(**kwargs):
+        return lambda session: session
+
+    class RSAKey:
+        def __init__(self, p, q, e):
+            self.n = p * q
+            self.d = pow(e, -1, (p - 1) * (q - 1))
+
+        def decrypt(self, c):
+            return pow(c, self.d, self.n)
+
+    class StdioSession:
+        print = staticmethod(print)
+
+        async def input(self, prompt=""):
+            return input(prompt)
 
+    def run_stdio(session):
+        try:
+            session(StdioSession()).send(None)
+        except StopIteration as stop:
+            sys.exit(stop.value)
+
+e = 65537
 FLAG = open('flag.txt', 'rb').read().strip()
-cFLAG = pow(bytes_to_long(FLAG), e, n)
 
-print("Shroomish challenges you...")
-print("n =", n)
-print("c =", cFLAG)
+# the LSB attack needs one query per bit of n
+@limits(queries=2048, cpu_s=10, idle_s=120)
+async def session(io):
+    p, q = getPrime(512), getPrime(512)
+    key = RSAKey(p, q, e)
+    n = key.n
+
+    cFLAG = powmod(bytes_to_long(FLAG), e, n)
+
+    io.print("Shroomish challenges you...")
+    io.print("n =", n)
+    io.print("c =", cFLAG)
+
+    while True:
+        io.print("Shroomish offers to decrypt...")
+        c = int(await io.input('Ciphertext: '))
+        m = key.decrypt(c)
+        io.print(f"Shroomish gives one piece: {m % 2}\n")
 
-while True:
-    print("Shroomish offers to decrypt...")
-    c = int(input('Ciphertext: '))
-    m = pow(c, d, n)
-    print(f"Shroomish gives one piece: {m % 2}\n")
+if __name__ == "__main__":
+    run_stdio(session)
 
 
 # Challenge: Shroomish
@@ -1,11 +1,11 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
 from pwn import *
 from Crypto.Util.number import long_to_bytes
-
-def send_to_oracle(c):
-    io.sendlineafter(b"Ciphertext: ", str(c).encode())
-    io.recvuntil(b"Shroomish gives one piece: ")
-
-    return int(io.recvline().decode())
+from saga.nt import powmod
+from saga.oracle import PipelinedOracle
+from saga.transcript import process
 
 io = process(["python3", "chall.py"])
 # context.log_level = "debug"
@@ -15,15 +15,27 @@ io.recvuntil(b"c = ")
 c = int(io.recvline().decode())
 e = 65537
 
-upper_limit = n
-lower_limit = 0
+oracle = PipelinedOracle(
+    io,
+    encode=lambda c: str(c).encode() + b"\n",
+    decode=int,
+    lead=b"Shroomish offers to decrypt...\nCiphertext: Shroomish gives one piece: ",
+    tail=b"\n",
+)
+
+rounds = n.bit_length() + 10
+
+def queries():
+    shift = powmod(2, e, n)
+    ct = c
+    for i in range(rounds):
+        ct = ct * shift % n
+        yield ct
 
-i = 1
-while i <= n.bit_length() + 10:
-    if not send_to_oracle(c * pow(2**i, e, n) % n):
-        upper_limit = (upper_limit + lower_limit)//2
-    else:
-        lower_limit = (lower_limit + upper_limit)//2
-    i += 1
+# m lies strictly between k*n/2^i and (k+1)*n/2^i; keeping k exact instead
+# of halving rounded bounds leaves no error to land in the last byte
+k = 0
+for bit in oracle.stream(queries()):
+    k = 2 * k + bit
 
-print(long_to_bytes(lower_limit))
\ No newline at end of file
+print(long_to_bytes(k * n // 2**rounds + 1))
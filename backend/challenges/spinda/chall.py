@@ -1,26 +1,47 @@
+import os, sys
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad
-import os
+
+try:
+    from saga.session import run_stdio
+except ImportError:
+    # the handout on its own: the same session on plain input() and print()
+
+    class StdioSession:
+        print = staticmethod(print)
+
+        async def input(self, prompt=""):
+            return input(prompt)
+
+    def run_stdio(session):
+        try:
+            session(StdioSession()).send(None)
+        except StopIteration as stop:
+            sys.exit(stop.value)
 
 def encrypt(key, pt):
     cipher = AES.new(key, AES.MODE_CBC)
     ct = cipher.decrypt(pad(pt, 16))
     return cipher.iv + ct
 
-print("Spinda challenges you...")
-print("Spinda wants plaintext, Spinda gives ciphertext...")
-
 FLAG = open('flag.txt', 'rb').read().strip()
 assert len(FLAG) == 50
 
-KEY = os.urandom(16)
-cFLAG = encrypt(KEY, FLAG)
-print("Spinda gives special ciphertext:", cFLAG.hex())
+async def session(io):
+    io.print("Spinda challenges you...")
+    io.print("Spinda wants plaintext, Spinda gives ciphertext...")
+
+    KEY = os.urandom(16)
+    cFLAG = encrypt(KEY, FLAG)
+    io.print("Spinda gives special ciphertext:", cFLAG.hex())
+
+    while True:
+        m = bytes.fromhex(await io.input("Spinda wants plaintext: "))
+        c = encrypt(KEY, m)
+        io.print("Spinda gives ciphertext:", c.hex())
 
-while True:
-    m = bytes.fromhex(input("Spinda wants plaintext: "))
-    c = encrypt(KEY, m)
-    print("Spinda gives ciphertext:", c.hex())
+if __name__ == "__main__":
+    run_stdio(session)
 
 
 # Challenge: Spinda
@@ -1,5 +1,9 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
 from pwn import *
 from string import printable
+from saga.transcript import process
 
 def repeating_xor(ct, key):
     res = [ct[i] ^ key[i % len(key)] for i in range(len(ct))]
@@ -1,69 +1,110 @@
+import sys
 from Crypto.Util.number import getRandomRange
 import ecdsa, hashlib, string
 
+try:
+    from saga.metrics import timed
+    from saga.session import run_stdio
+except ImportError:
+    # the handout on its own: the same session on plain input() and print()
+    import contextlib
+
+    class timed(contextlib.ContextDecorator):
+        def __init__(self, name):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+    class StdioSession:
+        print = staticmethod(print)
+
+        async def input(self, prompt=""):
+            return input(prompt)
+
+    def run_stdio(session):
+        try:
+            session(StdioSession()).send(None)
+        except StopIteration as stop:
+            sys.exit(stop.value)
+
 FLAG = open("flag.txt", "rb").read().strip()
 
 E = ecdsa.curves.SECP256k1
-g = E.generator * 246
+# Precomputed table for g.  ecdsa builds it on the first multiplication,
+# so do one here: zygote children then inherit it instead of each building
+# its own (g * 1 returns early without building it)
+g = ecdsa.ellipticcurve.PointJacobi.from_affine((E.generator * 246).to_affine(), generator=True)
+g * 2
+gx = g.x()
 n = E.order
 p = E.curve.p()
 
-def keygen():
+def keygen(io):
     x = getRandomRange(1, n - 1)
     y = g * -x
-    print("Tentacool resets the key...")
-    print("x =", x)
+    io.print("Tentacool resets the key...")
+    io.print("x =", x)
     return x, y
 
+@timed("tentacool.sign")
 def sign(x, m: bytes):
-    k = ecdsa.rfc6979.generate_k(g.x(), x % g.x(), hashlib.sha512, m) * p % n
+    k = ecdsa.rfc6979.generate_k(gx, x % gx, hashlib.sha512, m) * p % n
     r = g * k
     r = r.x()
     e = int(hashlib.sha256(str(r).encode() + m).hexdigest(), 16)
     s = (k + x * e) % n
     return e, s
 
+@timed("tentacool.verify")
 def verify(y, m: bytes, e, s):
-    r = g * s + y * e
+    r = g.mul_add(s, y, e)
     r = r.x()
     ev = int(hashlib.sha256(str(r).encode() + m).hexdigest(), 16)
     return e == ev
 
-print("Tentacool challenges you...")
-x, y = keygen()
-for _ in range(27):
-    print("1. Keygen")
-    print("2. Sign")
-    print("3. Verify")
-    choice = int(input(">> "))
-
-    if choice == 1:
-        x, y = keygen()
-    elif choice == 2:
-        m = bytes.fromhex(input("Message: "))
-        if any(c.encode() in m for c in string.printable):
-            print("Invalid message")
-            continue
-        e, s = sign(x, m)
-        print(f"Signature: ({e}, {s})")
-    elif choice == 3:
-        m = bytes.fromhex(input("Message: "))
-        e = int(input("e: "), 16)
-        s = int(input("s: "), 16)
-
-        if not verify(y, m, e, s):
-            print("Invalid")
-            exit(1)
-
-        print("Valid")
-        pt = m.decode()
-
-        if pt == 'Tentacool approves of this message!':
-            print(FLAG)
-            exit(0)
-        else:
-            break
-    print("Tentacool bids farewell...")
+async def session(io):
+    io.print("Tentacool challenges you...")
+    x, y = keygen(io)
+    for _ in range(27):
+        io.print("1. Keygen")
+        io.print("2. Sign")
+        io.print("3. Verify")
+        choice = int(await io.input(">> "))
+
+        if choice == 1:
+            x, y = keygen(io)
+        elif choice == 2:
+            m = bytes.fromhex(await io.input("Message: "))
+            if any(c.encode() in m for c in string.printable):
+                io.print("Invalid message")
+                continue
+            e, s = sign(x, m)
+            io.print(f"Signature: ({e}, {s})")
+        elif choice == 3:
+            m = bytes.fromhex(await io.input("Message: "))
+            e = int(await io.input("e: "), 16)
+            s = int(await io.input("s: "), 16)
+
+            if not verify(y, m, e, s):
+                io.print("Invalid")
+                return 1
+
+            io.print("Valid")
+            pt = m.decode()
+
+            if pt == 'Tentacool approves of this message!':
+                io.print(FLAG)
+                return 0
+            else:
+                break
+        io.print("Tentacool bids farewell...")
+
+if __name__ == "__main__":
+    run_stdio(session)
 
 
 # Challenge: Tentacool
@@ -0,0 +1,32 @@
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+import re
+import time
+from Crypto.Util.number import long_to_bytes
+from saga.nt import invert, powmod
+from saga.poly import from_terms, integer_roots, resultant, specialize
+
+
+def solve(instance):
+    values = dict(re.findall(r"(\w+) = (\d+)", instance))
+    res1, res2, c = (int(values[k]) for k in ("res1", "res2", "c"))
+
+    # polynomials in (p, q), keyed by (deg p, deg q)
+    f1 = from_terms({(3, 2): 2, (7, 1): 7, (0, 2): 5, (0, 0): -res1})
+    f2 = from_terms({(13, 0): 1, (1, 1): 12, (3, 5): 31, (1, 0): 1, (0, 0): -res2})
+
+    f3 = resultant(f1, f2)
+    p = max(integer_roots(f3))
+    q = max(integer_roots(specialize(f1, p)))
+
+    n = p * q
+    d = invert(65537, (p - 1)*(q - 1))
+    return long_to_bytes(powmod(c, d, n))
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    flag = solve(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "output.txt")).read())
+    print(f"solved in {time.perf_counter() - start:.3f}s")
+    print(flag)
@@ -0,0 +1 @@
+"""Shared Python tooling for the challenges in backend/challenges."""
@@ -0,0 +1,5 @@
+"""Loaded by every Python process that ``saga.bench`` starts; see there."""
+
+from saga import bench
+
+bench.install()
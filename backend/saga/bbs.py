@@ -0,0 +1,107 @@
+"""Blum-Blum-Shub state recovery for small moduli, as in crawdaunt's ClawRNG.
+
+With ``M = p*q`` below 2^16 every residue fits in a uint16, so the squaring
+orbits of all candidate seeds are precomputed as NumPy arrays and their
+parity outputs packed into one 64-bit signature each.  Recovering the
+generator state from observed bits is then a single dict probe, and
+:meth:`BBSTable.prefix_length` says how few bits are needed before the
+state is pinned down for every candidate.
+
+States are compared by the parity stream they go on to produce rather than
+by value: two residues that emit identical bits forever are the same state
+as far as prediction goes, and telling them apart would cost bits that can
+never be observed.
+"""
+
+import numpy as np
+
+
+class BBSTable:
+    """Orbits of ``x -> x^2 mod M`` for ``seeds`` (default: every residue).
+
+    Bit ``i`` of a signature is the parity of the state after ``i + 1``
+    squarings, which is what ``get_bit`` returns on its ``i``-th call.
+    """
+
+    def __init__(self, M, seeds=None, length=64):
+        if not 1 < M < 1 << 16:
+            raise ValueError("M must fit in 16 bits")
+        if not 0 < length <= 64:
+            raise ValueError("length must be between 1 and 64")
+        self.M = M
+        self.length = length
+        residues = np.arange(M, dtype=np.int64)
+        succ = (residues * residues % M).astype(np.uint16)
+        if seeds is None:
+            start = residues.astype(np.uint16)
+        else:
+            start = np.unique(np.asarray(list(seeds), dtype=np.int64) % M).astype(np.uint16)
+
+        self.states = np.empty((length + 1, len(start)), dtype=np.uint16)
+        self.states[0] = start
+        for i in range(length):
+            self.states[i + 1] = succ[self.states[i]]
+
+        bits = (self.states[1:] & 1).astype(np.uint64)
+        shifts = np.arange(length, dtype=np.uint64)[:, None]
+        self.signatures = np.bitwise_or.reduce(bits << shifts, axis=0)
+        self.classes = _output_classes(succ)
+        self._index = {}
+
+    def _ambiguous(self, L):
+        keys = self.signatures & np.uint64((1 << L) - 1)
+        classes = self.classes[self.states[L]]
+        pairs = np.unique(np.stack([keys, classes.astype(np.uint64)]), axis=1)
+        return len(np.unique(pairs[0])) != pairs.shape[1]
+
+    def prefix_length(self):
+        """Smallest L such that L observed bits determine the state for every seed.
+
+        Returns None if ``length`` bits are not enough for some seeds.
+        """
+        for L in range(1, self.length + 1):
+            if not self._ambiguous(L):
+                return L
+        return None
+
+    def index(self, L):
+        """Map an L-bit signature to the state after L steps (None if ambiguous)."""
+        if L not in self._index:
+            keys = (self.signatures & np.uint64((1 << L) - 1)).tolist()
+            states = self.states[L]
+            index = {}
+            for key, state, cls in zip(keys, states.tolist(), self.classes[states].tolist()):
+                if key not in index:
+                    index[key] = (state, cls)
+                elif index[key] is not None and index[key][1] != cls:
+                    index[key] = None
+            self._index[L] = {key: entry and entry[0] for key, entry in index.items()}
+        return self._index[L]
+
+    def lookup(self, bits):
+        """Return the state after ``len(bits)`` steps that produced ``bits``.
+
+        Raises KeyError if no seed matches and ValueError if the matching
+        states would go on to produce different bits.
+        """
+        key = sum(int(b) << i for i, b in enumerate(bits))
+        state = self.index(len(bits))[key]
+        if state is None:
+            raise ValueError("bits match more than one state")
+        return state
+
+
+def _output_classes(succ):
+    """Label residues so equal labels emit the same parity stream forever.
+
+    Moore-style partition refinement on the squaring map: start from the
+    parity of the next state and split classes until successors agree.
+    """
+    classes = (succ & 1).astype(np.int64)
+    count = len(np.unique(classes))
+    while True:
+        _, refined = np.unique(classes * count + classes[succ], return_inverse=True)
+        refined = refined.reshape(-1)
+        if refined.max() + 1 == count:
+            return refined
+        classes, count = refined, refined.max() + 1
@@ -0,0 +1,326 @@
+"""End-to-end solver benchmark: seeded challenge, matching solver, JSON out.
+
+    python -m saga.bench [carnivine bagon ...] --seed 1 --runs 3 --out bench.json
+
+Every Python process the benchmark starts (the solver and, through it, the
+challenge) loads ``saga/_site/sitecustomize.py``, which calls
+:func:`install`.  With ``SAGA_SEED`` set, ``os.urandom``, ``random``,
+``secrets`` and PyCryptodome's generator all draw from one stream seeded by
+the seed and the script name, and primes bypass the shared pool, so a seed
+pins down both the instance and the solver.  A script started again in the
+same run, such as a challenge whose first instance the solver threw back,
+draws the seed's next stream instead of repeating the first.  A challenge process also
+reads its own stdin to count the lines it read (queries) and the reads
+that had to wait for the peer (round trips).  Every process keeps its CPU
+time and those counts in a small shared mapping,
+``$SAGA_BENCH_STATS/<script>.<pid>``, refreshed on every read, so the
+numbers survive pwntools ending the challenge with SIGKILL.
+
+Interactive challenges are solved in place, their solvers start
+``chall.py`` themselves.  A static challenge is generated into a scratch
+directory under the seed first and its ``solve.py`` runs there on the
+fresh ``output.txt``.  A run counts as solved when the solver prints the
+flag; challenges without a ``solve.py`` are reported as skipped.
+
+``--record DIR`` keeps a :mod:`saga.transcript` of every interactive run,
+``DIR/<name>.<seed>.sgt``, and ``--replay DIR`` runs the solvers against
+those transcripts instead of ``chall.py``, so the numbers are the
+solver's alone.
+"""
+
+import argparse
+import atexit
+import builtins
+import json
+import mmap
+import os
+import random
+import select
+import shutil
+import signal
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+from saga import catalog, transcript
+from saga.session import CHALLENGES_DIR, _strip_newline
+
+SEED_ENV = "SAGA_SEED"
+STATS_ENV = "SAGA_BENCH_STATS"
+SITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_site")
+BACKEND_DIR = os.path.dirname(CHALLENGES_DIR)
+RECORD = struct.Struct("<dQQd")  # cpu seconds, queries, round trips, blocked seconds
+
+
+def seed_process(seed, role):
+    """Replace every randomness source of this process by a stream keyed on ``seed``."""
+    rng = random.Random(f"{seed}:{role}")
+    urandom = rng.randbytes
+    os.urandom = urandom
+    random._urandom = urandom  # SystemRandom and secrets
+    random.seed(f"{seed}:{role}")
+    try:
+        import Crypto.Random
+    except ImportError:
+        pass
+    else:
+        Crypto.Random.urandom = Crypto.Random.get_random_bytes = urandom
+    from saga import primes
+    primes._pool = lambda bits: None
+
+
+class _Stats:
+    """CPU time and stdin counters of one process, kept in a shared mapping.
+
+    Updating the mapping is a memory write, cheap enough to do on every
+    query, and the page outlives the process even when it is killed.
+    """
+
+    def __init__(self, path):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.ftruncate(fd, RECORD.size)
+        self.map = mmap.mmap(fd, RECORD.size)
+        os.close(fd)
+        self.queries = 0
+        self.round_trips = 0
+        self.blocked = 0.0
+
+    def record(self):
+        times = os.times()
+        RECORD.pack_into(self.map, 0, times.user + times.system, self.queries, self.round_trips, self.blocked)
+
+
+class _CountingStdin:
+    """``input()`` over fd 0 that knows whether a read had to wait."""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.buffer = b""
+
+    def readline(self):
+        while True:
+            end = self.buffer.find(b"\n")
+            if end >= 0:
+                line, self.buffer = self.buffer[:end + 1], self.buffer[end + 1:]
+                return line
+            if not select.select([0], [], [], 0)[0]:
+                self.stats.round_trips += 1
+                self.stats.record()
+                start = time.perf_counter()
+                select.select([0], [], [])
+                self.stats.blocked += time.perf_counter() - start
+            chunk = os.read(0, 1 << 16)
+            if not chunk:
+                line, self.buffer = self.buffer, b""
+                return line
+            self.buffer += chunk
+
+    def input(self, prompt=""):
+        self.stats.record()
+        if prompt:
+            sys.stdout.write(str(prompt))
+        sys.stdout.flush()
+        line = self.readline()
+        if not line:
+            raise EOFError("EOF when reading a line")
+        self.stats.queries += 1
+        self.stats.record()
+        return _strip_newline(line.decode())
+
+
+def install():
+    """Apply ``SAGA_SEED`` and ``SAGA_BENCH_STATS`` to this process."""
+    role = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "python"
+    stats_dir = os.environ.get(STATS_ENV)
+    if os.environ.get(SEED_ENV) is not None:
+        # a solver that restarts its challenge gets a new instance, still
+        # fixed by the seed: the n-th start of a script in a run is its own stream
+        starts = sum(name.startswith(role + ".") for name in os.listdir(stats_dir)) if stats_dir else 0
+        seed_process(os.environ[SEED_ENV], f"{role}#{starts}" if starts else role)
+    if stats_dir:
+        stats = _Stats(os.path.join(stats_dir, f"{role}.{os.getpid()}"))
+        if role == "chall.py":
+            builtins.input = _CountingStdin(stats).input
+        atexit.register(stats.record)
+
+
+def _environment(seed, stats_dir):
+    env = dict(os.environ)
+    env[SEED_ENV] = str(seed)
+    env[STATS_ENV] = stats_dir
+    env["PYTHONHASHSEED"] = str(seed % 2**32)
+    env["PWNLIB_NOTERM"] = "1"
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SITE_DIR, BACKEND_DIR, env.get("PYTHONPATH")]))
+    return env
+
+
+def _run(argv, cwd, env, timeout):
+    """Run ``argv`` in its own process group; return (returncode, stdout, seconds)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        argv, cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    try:
+        out, _ = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        out = b""
+    finally:
+        # the challenge a solver started may outlive it
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        proc.wait()
+    return proc.returncode, out, time.perf_counter() - start
+
+
+def _collect(stats_dir):
+    records = []
+    for name in os.listdir(stats_dir):
+        with open(os.path.join(stats_dir, name), "rb") as f:
+            cpu, queries, round_trips, blocked = RECORD.unpack(f.read())
+        records.append({
+            "role": name.rpartition(".")[0],
+            "cpu_s": cpu,
+            "queries": queries,
+            "round_trips": round_trips,
+            "blocked_s": blocked,
+        })
+    return records
+
+
+def transcript_path(directory, name, seed):
+    return os.path.join(directory, f"{name}.{seed}.sgt")
+
+
+def run(name, seed, timeout=600, challenges_dir=CHALLENGES_DIR, kind=None, record=None, replay=None):
+    """Benchmark one seeded run of ``name``; returns its result record.
+
+    ``record`` and ``replay`` are transcript directories, used for
+    interactive challenges only.
+    """
+    path = os.path.join(challenges_dir, name)
+    kind = kind or catalog.challenge_kind(open(os.path.join(path, "chall.py")).read())
+    result = {"name": name, "kind": kind, "seed": seed}
+    if not os.path.exists(os.path.join(path, "solve.py")):
+        result["skipped"] = "no solve.py"
+        return result
+    with open(os.path.join(path, "flag.txt"), "rb") as f:
+        flag = f.read().strip()
+
+    with tempfile.TemporaryDirectory() as stats_dir, tempfile.TemporaryDirectory() as scratch:
+        env = _environment(seed, stats_dir)
+        if kind == "interactive" and replay:
+            env[transcript.REPLAY_ENV] = transcript_path(replay, name, seed)
+            if not os.path.exists(env[transcript.REPLAY_ENV]):
+                result["skipped"] = "no transcript"
+                return result
+            result["replayed"] = True
+        elif kind == "interactive" and record:
+            os.makedirs(record, exist_ok=True)
+            env[transcript.RECORD_ENV] = transcript_path(record, name, seed)
+        cwd = path
+        if kind == "static":
+            os.symlink(os.path.join(path, "flag.txt"), os.path.join(scratch, "flag.txt"))
+            _, printed, result["generate_s"] = _run([sys.executable, os.path.join(path, "chall.py")], scratch, env, timeout)
+            output = os.path.join(scratch, "output.txt")
+            if not os.path.exists(output):
+                with open(output, "wb") as f:
+                    f.write(printed)
+            shutil.copy(os.path.join(path, "solve.py"), scratch)
+            cwd = scratch
+        returncode, out, wall = _run([sys.executable, "solve.py"], cwd, env, timeout)
+        records = _collect(stats_dir)
+
+    servers = [r for r in records if r["role"] == "chall.py"]
+    result.update({
+        "solved": flag in out,
+        "returncode": returncode,
+        "wall_s": wall,
+        "solver_cpu_s": sum(r["cpu_s"] for r in records if r["role"] == "solve.py"),
+        "server_cpu_s": sum(r["cpu_s"] for r in servers),
+        "queries": sum(r["queries"] for r in servers),
+        "round_trips": sum(r["round_trips"] for r in servers),
+        "server_blocked_s": sum(r["blocked_s"] for r in servers),
+    })
+    return result
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(results):
+    """Per-challenge medians over the runs that were not skipped."""
+    summary = {}
+    for name in dict.fromkeys(r["name"] for r in results):
+        runs = [r for r in results if r["name"] == name and "skipped" not in r]
+        if not runs:
+            continue
+        summary[name] = {"runs": len(runs), "solved": sum(r["solved"] for r in runs)}
+        for key in ("wall_s", "solver_cpu_s", "server_cpu_s", "queries", "round_trips"):
+            summary[name][key] = statistics.median(r[key] for r in runs)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="challenges to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="run i uses seed + i")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=600, help="seconds per solver run")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--challenges", default=CHALLENGES_DIR)
+    parser.add_argument("--record", metavar="DIR", help="keep a transcript of every interactive run in DIR")
+    parser.add_argument("--replay", metavar="DIR", help="replay interactive runs from the transcripts in DIR")
+    args = parser.parse_args()
+    if args.record and args.replay:
+        parser.error("--record and --replay are exclusive")
+
+    index = catalog.build(args.challenges)
+    names = args.names or sorted(index["challenges"])
+    results = []
+    for name in names:
+        for i in range(args.runs):
+            result = run(
+                name, args.seed + i, args.timeout, args.challenges, index["challenges"][name]["kind"],
+                args.record, args.replay,
+            )
+            results.append(result)
+            if "skipped" in result:
+                print(f"{name}: skipped ({result['skipped']})", file=sys.stderr)
+                break
+            print(
+                f"{name} seed={result['seed']}: {'solved' if result['solved'] else 'FAILED'}"
+                f" in {result['wall_s']:.2f}s, server cpu {result['server_cpu_s']:.2f}s,"
+                f" {result['queries']} queries, {result['round_trips']} round trips",
+                file=sys.stderr,
+            )
+
+    report = {
+        "commit": _commit(),
+        "python": sys.version.split()[0],
+        "seed": args.seed,
+        "runs": args.runs,
+        "results": results,
+        "summary": summarize(results),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
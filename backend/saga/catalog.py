@@ -0,0 +1,191 @@
+"""Challenge catalog built from the metadata trailers of every ``chall.py``.
+
+    python -m saga.catalog [--tag algc:RSA ...]
+
+Each ``chall.py`` ends with a block of ``# Key: value`` comments (Challenge,
+Original, Author, ..., Tags).  The catalog collects those, the kind of the
+challenge (``interactive`` if it exposes ``async def session``, otherwise
+``static``), the files handed to players with their sizes and SHA-256
+digests, and the SHA-256 of the stripped flag, into one JSON index that the
+matchmaker keeps in memory.
+
+Rebuilding is incremental: a file whose size and mtime match the previous
+index keeps its recorded digest, and ``chall.py`` is only re-parsed when it
+changed, so an unchanged tree costs one ``stat`` per file.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+
+from saga.session import CHALLENGES_DIR
+
+CATALOG_PATH = os.path.join(CHALLENGES_DIR, "catalog.json")
+VERSION = 1
+
+_TRAILER_LINE = re.compile(r"#\s*([A-Za-z]+):\s*(.*?)\s*$")
+
+
+def parse_trailer(source):
+    """Return the ``# Key: value`` block at the end of ``source`` as a dict.
+
+    Keys are lower-cased; ``tags`` is decoded from its JSON list.
+    """
+    meta = {}
+    for line in reversed(source.rstrip().splitlines()):
+        match = _TRAILER_LINE.fullmatch(line.strip())
+        if not match:
+            break
+        meta.setdefault(match.group(1).lower(), match.group(2))
+    meta = dict(reversed(meta.items()))
+    meta["tags"] = json.loads(meta["tags"]) if "tags" in meta else []
+    return meta
+
+
+def challenge_kind(source):
+    """``interactive`` if the module defines ``async def session``, else ``static``."""
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.AsyncFunctionDef) and node.name == "session":
+            return "interactive"
+    return "static"
+
+
+def is_player_file(name):
+    """Files shipped to players: everything but the flag and the solvers."""
+    return name != "flag.txt" and not name.startswith("solve.")
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stamp(st):
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _unchanged(previous, st):
+    return previous is not None and previous.get("size") == st.st_size and previous.get("mtime_ns") == st.st_mtime_ns
+
+
+def _file_entry(path, previous):
+    st = os.stat(path)
+    if _unchanged(previous, st):
+        return previous
+    return {"name": os.path.basename(path), **_stamp(st), "sha256": _sha256(path)}
+
+
+def _flag_entry(path, previous):
+    st = os.stat(path)
+    if _unchanged(previous, st):
+        return previous
+    with open(path, "rb") as f:
+        flag = f.read().strip()
+    return {**_stamp(st), "sha256": hashlib.sha256(flag).hexdigest()}
+
+
+def _challenge_entry(path, previous):
+    previous = previous or {}
+    chall_path = os.path.join(path, "chall.py")
+    st = os.stat(chall_path)
+    source_stamp = previous.get("source")
+    if _unchanged(source_stamp, st):
+        meta, kind = {**previous["meta"], "tags": previous["tags"]}, previous["kind"]
+    else:
+        with open(chall_path, encoding="utf-8") as f:
+            source = f.read()
+        meta, kind = parse_trailer(source), challenge_kind(source)
+        source_stamp = _stamp(st)
+
+    old_files = {entry["name"]: entry for entry in previous.get("files", [])}
+    files = []
+    for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+        if entry.is_file() and is_player_file(entry.name):
+            files.append(_file_entry(entry.path, old_files.get(entry.name)))
+
+    return {
+        "name": os.path.basename(path),
+        "kind": kind,
+        "tags": meta["tags"],
+        "meta": {key: value for key, value in meta.items() if key != "tags"},
+        "files": files,
+        "flag": _flag_entry(os.path.join(path, "flag.txt"), previous.get("flag")),
+        "source": source_stamp,
+    }
+
+
+def build(challenges_dir=CHALLENGES_DIR, previous=None):
+    """Index every directory of ``challenges_dir`` that holds a ``chall.py``.
+
+    ``previous`` is an earlier catalog; entries whose files did not change
+    are reused instead of being hashed again.
+    """
+    old = (previous or {}).get("challenges", {})
+    challenges = {}
+    for entry in sorted(os.scandir(challenges_dir), key=lambda entry: entry.name):
+        if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "chall.py")):
+            challenges[entry.name] = _challenge_entry(entry.path, old.get(entry.name))
+
+    tags = {}
+    for name, challenge in challenges.items():
+        for tag in challenge["tags"]:
+            tags.setdefault(tag, []).append(name)
+    return {"version": VERSION, "challenges": challenges, "tags": dict(sorted(tags.items()))}
+
+
+def load(path=CATALOG_PATH):
+    """Read a catalog written by :func:`update`; ``None`` if missing or stale."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return catalog if catalog.get("version") == VERSION else None
+
+
+def update(challenges_dir=CHALLENGES_DIR, path=CATALOG_PATH):
+    """Rebuild the catalog at ``path`` incrementally; rewrite it only if it changed."""
+    previous = load(path)
+    catalog = build(challenges_dir, previous)
+    if catalog != previous:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(catalog, f, indent=1)
+        os.replace(tmp, path)
+    return catalog
+
+
+def select(catalog, tags=(), kind=None):
+    """Names of the challenges carrying every tag in ``tags`` (and of ``kind``, if given)."""
+    names = None
+    for tag in tags:
+        tagged = set(catalog["tags"].get(tag, ()))
+        names = tagged if names is None else names & tagged
+    if names is None:
+        names = set(catalog["challenges"])
+    return sorted(name for name in names if kind is None or catalog["challenges"][name]["kind"] == kind)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--challenges", default=CHALLENGES_DIR)
+    parser.add_argument("--out", default=None, help="catalog path (default: <challenges>/catalog.json)")
+    parser.add_argument("--tag", action="append", default=[], help="only list challenges with this tag")
+    parser.add_argument("--kind", choices=("interactive", "static"))
+    args = parser.parse_args()
+
+    catalog = update(args.challenges, args.out or os.path.join(args.challenges, "catalog.json"))
+    for name in select(catalog, args.tag, args.kind):
+        challenge = catalog["challenges"][name]
+        files = ", ".join(entry["name"] for entry in challenge["files"])
+        print(f"{name:<12} {challenge['kind']:<12} {' '.join(challenge['tags'])}  [{files}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Recover p from a CRT exponent leak ``dp = d mod (p-1)``.
+
+Since ``e*dp = 1 (mod p-1)``, every r satisfies ``r^(e*dp) = r (mod p)``, so
+``gcd(r^(e*dp) - r, n)`` exposes p with one exponentiation and no
+factorization of ``e*dp - 1``.  The divisor search over a known
+factorization of ``e*dp - 1`` is kept for instances where only that is
+available.
+"""
+
+from itertools import product
+from math import gcd, prod
+from multiprocessing import Pool
+
+from saga.nt import powmod
+
+
+def factor_from_dp(n, e, dp, bases=range(2, 64)):
+    """Return the prime p with ``dp = d mod (p-1)``, or None."""
+    for r in bases:
+        g = gcd(powmod(r, e * dp, n) - r, n)
+        if 1 < g < n:
+            return g
+    return None
+
+
+def _multiplicities(factors):
+    counts = {}
+    for f in factors:
+        counts[f] = counts.get(f, 0) + 1
+    return sorted(counts.items())
+
+
+def _search_divisors(n, fixed, counts, first_exponents):
+    primes = [f for f, _ in counts]
+    for exps in product(first_exponents, *(range(c + 1) for _, c in counts[1:])):
+        p = fixed * prod(f ** x for f, x in zip(primes, exps)) + 1
+        if n % p == 0 and 1 < p < n:
+            return p
+    return None
+
+
+def _search_shard(args):
+    return _search_divisors(*args)
+
+
+def factor_from_divisors(n, factors, fixed=1, processes=None):
+    """Find p with ``p - 1 = fixed * (a sub-multiset of factors)`` dividing n.
+
+    Each distinct sub-multiset is generated once, lazily, and the search
+    stops at the first hit; ``processes`` splits it on the exponent of the
+    first distinct factor.
+    """
+    counts = _multiplicities(factors)
+    if not counts:
+        p = fixed + 1
+        return p if n % p == 0 and 1 < p < n else None
+    first = range(counts[0][1] + 1)
+    if not processes or processes < 2:
+        return _search_divisors(n, fixed, counts, first)
+
+    shards = [(n, fixed, counts, first[i::processes]) for i in range(min(processes, len(first)))]
+    with Pool(len(shards)) as pool:
+        for p in pool.imap_unordered(_search_shard, shards):
+            if p:
+                pool.terminate()
+                return p
+    return None
@@ -0,0 +1,204 @@
+"""Univariate polynomials over GF(p) and their roots, for large prime p.
+
+Polynomials are lists of coefficients in ``range(p)``, constant term first,
+with no trailing zeros (``[]`` is zero); every function takes the modulus
+explicitly.  :func:`roots` keeps only the linear part of f with
+``gcd(f, x^p - x)``, where ``x^p mod f`` comes from square-and-multiply,
+and splits it with Cantor-Zassenhaus, so the cost is about ``log p``
+multiplications of degree-``deg f`` polynomials.  Products above
+``KARATSUBA_CUTOFF`` coefficients use Karatsuba.  :func:`roots` works on
+:data:`saga.nt.mpz`, so on gmpy2 integers when gmpy2 is installed, which
+is about four times faster at 1024-bit p.
+"""
+
+import random
+
+from saga.nt import mpz
+
+KARATSUBA_CUTOFF = 32
+
+
+def trim(f):
+    f = list(f)
+    while f and not f[-1]:
+        f.pop()
+    return f
+
+
+def reduce(f, p):
+    return trim(c % p for c in f)
+
+
+def add(f, g, p):
+    if len(f) < len(g):
+        f, g = g, f
+    h = list(f)
+    for i, c in enumerate(g):
+        h[i] = (h[i] + c) % p
+    return trim(h)
+
+
+def sub(f, g, p):
+    return add(f, [-c % p for c in g], p)
+
+
+def scale(f, c, p):
+    c %= p
+    return trim(a * c % p for a in f) if c else []
+
+
+def _schoolbook(f, g):
+    h = [0] * (len(f) + len(g) - 1)
+    for i, a in enumerate(f):
+        if a:
+            for j, b in enumerate(g):
+                h[i + j] += a * b
+    return h
+
+
+def _karatsuba(f, g):
+    """Unreduced product of two coefficient lists of equal length."""
+    n = len(f)
+    if n <= KARATSUBA_CUTOFF:
+        return _schoolbook(f, g)
+    k = n // 2
+    f0, f1, g0, g1 = f[:k], f[k:], g[:k], g[k:]
+    low = _karatsuba(f0, g0)
+    high = _karatsuba(f1, g1)
+    fs = [a + b for a, b in zip(f0, f1)] + f1[k:]
+    gs = [a + b for a, b in zip(g0, g1)] + g1[k:]
+    mid = _karatsuba(fs, gs)
+    h = [0] * (2 * n - 1)
+    for i, c in enumerate(low):
+        h[i] += c
+        mid[i] -= c
+    for i, c in enumerate(high):
+        h[i + 2 * k] += c
+        mid[i] -= c
+    for i, c in enumerate(mid):
+        if c:
+            h[i + k] += c
+    return h
+
+
+def _product(f, g):
+    if min(len(f), len(g)) <= KARATSUBA_CUTOFF:
+        return _schoolbook(f, g)
+    n = max(len(f), len(g))
+    return _karatsuba(f + [0] * (n - len(f)), g + [0] * (n - len(g)))[:len(f) + len(g) - 1]
+
+
+def mul(f, g, p):
+    if not f or not g:
+        return []
+    return trim(c % p for c in _product(f, g))
+
+
+def divmod_(f, g, p):
+    """Quotient and remainder of f by a non-zero g."""
+    if not g:
+        raise ZeroDivisionError("polynomial division by zero")
+    r = list(f)
+    if len(r) < len(g):
+        return [], trim(r)
+    inv = pow(g[-1], -1, p)
+    q = [0] * (len(r) - len(g) + 1)
+    for i in range(len(q) - 1, -1, -1):
+        c = r[i + len(g) - 1] * inv % p
+        q[i] = c
+        if c:
+            for j, b in enumerate(g):
+                r[i + j] = (r[i + j] - c * b) % p
+    return trim(q), trim(r[:len(g) - 1])
+
+
+def mod(f, g, p):
+    return divmod_(f, g, p)[1]
+
+
+def monic(f, p):
+    return scale(f, pow(f[-1], -1, p), p) if f else []
+
+
+def gcd(f, g, p):
+    """Monic gcd of f and g."""
+    f, g = reduce(f, p), reduce(g, p)
+    while g:
+        f, g = g, mod(f, g, p)
+    return monic(f, p)
+
+
+def _reduce_monic(h, g, p):
+    """``h mod g`` for monic g, with one reduction mod p per coefficient."""
+    n = len(g) - 1
+    h = list(h)
+    for i in range(len(h) - 1, n - 1, -1):
+        c = h[i] % p
+        if c:
+            shift = i - n
+            for j in range(n):
+                h[shift + j] -= c * g[j]
+    return trim(c % p for c in h[:n])
+
+
+def powmod(base, n, modulus, p):
+    """``base^n mod modulus`` by left-to-right square-and-multiply."""
+    g = monic(reduce(modulus, p), p)
+    base = mod(base, g, p)
+    result = [1] if len(g) > 1 else []
+    if n and not base:
+        return []
+    for bit in bin(n)[2:] if n else "":
+        if result:
+            result = _reduce_monic(_product(result, result), g, p)
+        if bit == "1" and result:
+            result = _reduce_monic(_product(result, base), g, p)
+    return result
+
+
+def evaluate(f, x, p):
+    result = 0
+    for c in reversed(f):
+        result = (result * x + c) % p
+    return result
+
+
+def compose(f, g, p):
+    """``f(g(x))`` by Horner's rule on polynomials."""
+    result = []
+    for c in reversed(f):
+        result = add(mul(result, g, p), [c % p], p)
+    return result
+
+
+def _split(f, p, rng):
+    """Roots of a monic f that is a product of distinct linear factors."""
+    if len(f) == 1:
+        return []
+    if len(f) == 2:
+        return [-f[0] % p]
+    while True:
+        a = rng.randrange(int(p))
+        h = sub(powmod([a, 1], (p - 1) // 2, f, p), [1], p)
+        d = gcd(f, h, p)
+        if 1 < len(d) < len(f):
+            return _split(d, p, rng) + _split(divmod_(f, d, p)[0], p, rng)
+
+
+def roots(f, p, rng=None):
+    """The distinct roots of f in GF(p), in increasing order; p must be prime."""
+    f = reduce(f, p)
+    if not f:
+        raise ValueError("the zero polynomial has every element as a root")
+    if p == 2:
+        return [x for x in range(2) if evaluate(f, x, p) == 0]
+    p = mpz(p)
+    f = monic([mpz(c) for c in f], p)
+    found = []
+    if not f[0]:
+        found.append(0)
+        while not f[0]:
+            f = f[1:]
+    # the product of the distinct linear factors: gcd(f, x^p - x), without x
+    linear = gcd(f, sub(powmod([0, 1], p, f, p), [0, 1], p), p)
+    return sorted(int(r) for r in found + _split(linear, p, rng or random.Random()))
@@ -0,0 +1,170 @@
+"""Per-session budgets for the interactive challenges, and per-source admission.
+
+A challenge declares its limits once, on its session coroutine:
+
+    @limits(queries=4096, cpu_s=10, idle_s=120)
+    async def session(io):
+        ...
+
+(a handout run without ``saga`` swaps in a no-op ``limits``) and every driver (``run_stdio``, ``saga.host``, ``saga.zygote``) enforces
+them; a challenge without the decorator gets :data:`DEFAULT`.  The
+player's I/O is wrapped in :class:`GovernedIO`, which counts input lines
+(queries) and the CPU time the session spends between them, and checks
+both before reading the next line; a session that waits longer than
+``idle_s`` for a line is closed, which is what reaps abandoned
+connections.  A session over budget is told why and ends with
+:class:`SessionLimit`, an ``EOFError``, so challenge loops and drivers
+treat it as the player hanging up.  Processes that serve one session
+(``run_stdio``, zygote children) also get an ``RLIMIT_CPU`` backstop.
+
+New sessions are admitted per source address by :class:`SourceLimiter`: a
+token bucket of ``sessions_per_minute`` (bursts up to ``burst``) and at
+most ``concurrent`` open sessions.  ``saga.host`` keeps one limiter per
+worker, ``saga.zygote`` one for all of its children.
+"""
+
+import math
+import os
+import resource
+import time
+
+from saga import metrics
+
+
+class Limits:
+    """Budgets of one session and admission rules for one source; ``None`` is unlimited."""
+
+    def __init__(self, queries=None, cpu_s=60.0, idle_s=300.0, sessions_per_minute=30, burst=10, concurrent=8):
+        self.queries = queries
+        self.cpu_s = cpu_s
+        self.idle_s = idle_s
+        self.sessions_per_minute = sessions_per_minute
+        self.burst = burst
+        self.concurrent = concurrent
+
+
+DEFAULT = Limits()
+
+
+def limits(**kwargs):
+    """Decorator attaching :class:`Limits` to a challenge's ``session``."""
+
+    def attach(session):
+        session.limits = Limits(**kwargs)
+        return session
+
+    return attach
+
+
+def limits_of(session):
+    return getattr(session, "limits", DEFAULT)
+
+
+class SessionLimit(EOFError):
+    pass
+
+
+class GovernedIO:
+    """Session I/O wrapper that ends the session when it exceeds its budget.
+
+    The inner I/O raises ``TimeoutError`` when a line takes longer than the
+    idle limit it was given (the session classes take a ``timeout``).
+    """
+
+    def __init__(self, io, limits):
+        self.io = io
+        self.limits = limits
+        self.queries = 0
+        self.cpu = 0.0
+        self.resumed = time.thread_time()
+
+    def print(self, *args, **kwargs):
+        self.io.print(*args, **kwargs)
+
+    def _stop(self, kind, reason):
+        metrics.histogram(f"governor.{kind}", unit="count").add(self.queries)
+        try:
+            self.io.print(f"\nSession closed: {reason}.")
+        except OSError:
+            pass
+        raise SessionLimit(reason)
+
+    async def input(self, prompt=""):
+        # sessions only yield in input(), so thread time since the last
+        # line is this session's own work, also on a shared event loop
+        self.cpu += time.thread_time() - self.resumed
+        limits = self.limits
+        if limits.queries is not None and self.queries >= limits.queries:
+            self._stop("queries", f"{limits.queries} queries used")
+        if limits.cpu_s is not None and self.cpu > limits.cpu_s:
+            self._stop("cpu", f"over {limits.cpu_s:g} CPU seconds")
+        try:
+            line = await self.io.input(prompt)
+        except TimeoutError:
+            self._stop("idle", f"idle for {limits.idle_s:g} seconds")
+        self.queries += 1
+        self.resumed = time.thread_time()
+        return line
+
+
+def cap_process_cpu(limits, slack=2):
+    """Let the kernel kill this process once the session overruns its CPU budget.
+
+    For processes that serve a single session.  :class:`GovernedIO` only
+    checks between queries; this also stops a session stuck in one.
+    """
+    if limits.cpu_s is None:
+        return
+    times = os.times()
+    soft = math.ceil(times.user + times.system + limits.cpu_s) + slack
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+class SourceLimiter:
+    """Admission of new sessions per source address."""
+
+    SWEEP_AT = 4096
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.buckets = {}  # source -> [tokens, last refill]
+        self.active = {}
+
+    def admit(self, source):
+        """Take a session slot for ``source``; returns ``None`` or why it was refused."""
+        limits = self.limits
+        if limits.concurrent is not None and self.active.get(source, 0) >= limits.concurrent:
+            return self._reject(f"more than {limits.concurrent} open sessions")
+        if limits.sessions_per_minute is not None:
+            now = time.monotonic()
+            if len(self.buckets) >= self.SWEEP_AT:
+                self._sweep(now)
+            tokens, last = self.buckets.get(source, (limits.burst, now))
+            tokens = min(limits.burst, tokens + (now - last) * limits.sessions_per_minute / 60)
+            if tokens < 1:
+                self.buckets[source] = [tokens, now]
+                return self._reject(f"more than {limits.sessions_per_minute} sessions a minute")
+            self.buckets[source] = [tokens - 1, now]
+        self.active[source] = self.active.get(source, 0) + 1
+        return None
+
+    def release(self, source):
+        left = self.active.get(source, 0) - 1
+        if left > 0:
+            self.active[source] = left
+        else:
+            self.active.pop(source, None)
+
+    def _reject(self, reason):
+        metrics.histogram("governor.rejected", unit="count").add(1)
+        return reason
+
+    def _sweep(self, now):
+        # a bucket that has refilled completely is the same as no bucket
+        rate = self.limits.sessions_per_minute / 60
+        for source, (tokens, last) in list(self.buckets.items()):
+            if tokens + (now - last) * rate >= self.limits.burst:
+                del self.buckets[source]
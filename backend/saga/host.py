@@ -0,0 +1,105 @@
+"""Serve an interactive challenge to many players from one process.
+
+    python -m saga.host shroomish --port 1337 --workers 4
+
+Each connection runs the challenge's ``session`` coroutine as its own task,
+so a worker holds one interpreter and one copy of the challenge module no
+matter how many players are connected.  ``--workers`` forks that many
+processes sharing the listening socket, one per core.  Sessions run under
+the challenge's :mod:`saga.governor` limits, and each worker admits new
+connections per source address.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import traceback
+
+from saga import governor, metrics
+from saga.session import CHALLENGES_DIR, StreamSession, load_challenge
+
+LINE_LIMIT = 1 << 20
+
+
+async def close(writer, grace=5.0):
+    """Close ``writer``, dropping what a player who stopped reading never took."""
+    writer.close()
+    try:
+        await asyncio.wait_for(writer.wait_closed(), grace)
+    except (asyncio.TimeoutError, ConnectionError):
+        writer.transport.abort()
+
+
+async def handle(session, reader, writer, limiter):
+    source = (writer.get_extra_info("peername") or ("unknown",))[0]
+    refused = limiter.admit(source)
+    if refused:
+        writer.write(f"Too many sessions from {source}: {refused}.\n".encode())
+        await close(writer)
+        return
+    limits = limiter.limits
+    io = metrics.MeteredIO(StreamSession(reader, writer, limits.idle_s))
+    try:
+        await session(governor.GovernedIO(io, limits))
+        await writer.drain()
+    except (EOFError, ConnectionError):
+        pass
+    except Exception:
+        traceback.print_exc()
+    finally:
+        io.close()
+        limiter.release(source)
+        await close(writer)
+
+
+async def serve(session, sock):
+    limiter = governor.SourceLimiter(governor.limits_of(session))
+    server = await asyncio.start_server(
+        lambda reader, writer: handle(session, reader, writer, limiter),
+        sock=sock,
+        limit=LINE_LIMIT,
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def listen(host, port, backlog=1024):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+
+def spawn_workers(count):
+    """Fork until ``count`` processes share the listening socket."""
+    for _ in range(count - 1):
+        if os.fork() == 0:
+            return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("challenge")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=1337)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--challenges", default=CHALLENGES_DIR)
+    metrics.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    module = load_challenge(args.challenge, args.challenges)
+    sock = listen(args.host, args.port)
+    spawn_workers(args.workers)
+    metrics.export_from_args(args)
+    print(f"[{os.getpid()}] serving {args.challenge} on {args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(serve(module.session, sock))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
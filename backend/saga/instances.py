@@ -0,0 +1,179 @@
+"""Pre-generated per-match instances for the static challenges.
+
+    python -m saga.instances [scyther minccino ...] --low 4 --high 16
+
+The static challenges ship one committed ``output.txt``; running their
+``chall.py`` again gives a fresh instance but costs seconds of prime
+generation.  This service keeps a reservoir of ready instances on disk,
+``<instances>/<name>/ready/*.txt``, and tops it up with a process pool
+whenever a challenge drops below ``--low``, filling it back to ``--high``.
+
+Each generation runs ``chall.py`` in a scratch directory holding only a
+link to its ``flag.txt``, and the instance is whatever it wrote to
+``output.txt`` or, failing that, printed.  The committed files are never
+touched.  Claiming an instance is one ``rename`` out of ``ready/``, so each
+one is served exactly once and in constant time, also by the Node backend.
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import runpy
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+from saga import catalog
+from saga.session import CHALLENGES_DIR
+
+INSTANCES_DIR = os.path.join(os.path.dirname(CHALLENGES_DIR), "instances")
+
+_serial = itertools.count()
+
+
+def static_challenges(challenges_dir=CHALLENGES_DIR):
+    """Names of the static challenges that hand players an ``output.txt``."""
+    index = catalog.build(challenges_dir)
+    return [
+        name for name in catalog.select(index, kind="static")
+        if any(entry["name"] == "output.txt" for entry in index["challenges"][name]["files"])
+    ]
+
+
+def generate(name, challenges_dir=CHALLENGES_DIR):
+    """Run ``<name>/chall.py`` once in a scratch directory and return its output."""
+    path = os.path.join(challenges_dir, name)
+    cwd = os.getcwd()
+    # reservoir workers run thousands of these, so nothing a chall.py
+    # does to sys.path may outlive its run
+    search_path = sys.path[:]
+    with tempfile.TemporaryDirectory() as scratch:
+        os.symlink(os.path.join(path, "flag.txt"), os.path.join(scratch, "flag.txt"))
+        printed = io.StringIO()
+        os.chdir(scratch)
+        try:
+            with contextlib.redirect_stdout(printed):
+                runpy.run_path(os.path.join(path, "chall.py"), run_name="__main__")
+        finally:
+            os.chdir(cwd)
+            sys.path[:] = search_path
+        written = os.path.join(scratch, "output.txt")
+        if os.path.exists(written):
+            with open(written) as f:
+                return f.read()
+    return printed.getvalue()
+
+
+def _ready_dir(name, instances_dir):
+    return os.path.join(instances_dir, name, "ready")
+
+
+def count(name, instances_dir=INSTANCES_DIR):
+    try:
+        return len(os.listdir(_ready_dir(name, instances_dir)))
+    except FileNotFoundError:
+        return 0
+
+
+def store(name, text, instances_dir=INSTANCES_DIR):
+    """Publish one instance atomically into the reservoir of ``name``."""
+    ready = _ready_dir(name, instances_dir)
+    os.makedirs(ready, exist_ok=True)
+    stem = f"{time.time_ns()}-{os.getpid()}-{next(_serial)}"
+    tmp = os.path.join(instances_dir, name, f".{stem}.tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, os.path.join(ready, f"{stem}.txt"))
+
+
+def take(name, instances_dir=INSTANCES_DIR):
+    """Claim one ready instance of ``name``; ``None`` if the reservoir is empty."""
+    ready = _ready_dir(name, instances_dir)
+    claimed = os.path.join(instances_dir, name, "claimed")
+    os.makedirs(claimed, exist_ok=True)
+    try:
+        entries = os.scandir(ready)
+    except FileNotFoundError:
+        return None
+    with entries:
+        for entry in entries:
+            target = os.path.join(claimed, entry.name)
+            try:
+                os.rename(entry.path, target)
+            except FileNotFoundError:
+                continue
+            with open(target) as f:
+                text = f.read()
+            os.unlink(target)
+            return text
+    return None
+
+
+def _background():
+    os.nice(10)
+
+
+def _generate_task(args):
+    name, challenges_dir = args
+    return name, generate(name, challenges_dir)
+
+
+def refill(pool, names, low, high, challenges_dir=CHALLENGES_DIR, instances_dir=INSTANCES_DIR, stop=None):
+    """Bring every reservoir under ``low`` back up to ``high``; return how many were made.
+
+    ``stop`` is polled after each instance and ends the refill early when true.
+    """
+    needed = {}
+    for name in names:
+        have = count(name, instances_dir)
+        if have < low:
+            needed[name] = high - have
+    # round-robin, so no challenge waits behind another one's whole refill
+    tasks = [
+        (name, challenges_dir)
+        for i in range(max(needed.values(), default=0))
+        for name, need in needed.items() if i < need
+    ]
+    made = 0
+    for name, text in pool.imap_unordered(_generate_task, tasks):
+        store(name, text, instances_dir)
+        made += 1
+        if stop is not None and stop():
+            break
+    return made
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="challenges to serve (default: every static challenge with an output.txt)")
+    parser.add_argument("--low", type=int, default=4)
+    parser.add_argument("--high", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between watermark checks")
+    parser.add_argument("--once", action="store_true", help="fill every reservoir to --high and exit")
+    parser.add_argument("--challenges", default=CHALLENGES_DIR)
+    parser.add_argument("--instances", default=INSTANCES_DIR)
+    args = parser.parse_args()
+    if not args.once and not 0 <= args.low <= args.high:
+        parser.error("need 0 <= --low <= --high")
+
+    names = args.names or static_challenges(args.challenges)
+    low = args.high if args.once else args.low
+    # stop with whatever started us (the Node backend), not as an orphan
+    parent = os.getppid()
+    orphaned = lambda: os.getppid() != parent
+    with Pool(args.processes, initializer=_background) as pool:
+        while True:
+            made = refill(pool, names, low, args.high, args.challenges, args.instances, orphaned)
+            if made:
+                print("reservoir:", ", ".join(f"{name}={count(name, args.instances)}" for name in names), flush=True)
+            if args.once or orphaned():
+                break
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
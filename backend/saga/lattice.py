@@ -0,0 +1,311 @@
+"""LLL reduction and small-root lattices for the Coppersmith challenges.
+
+    python -m saga.lattice [-m 1 2 3] [--bits 256]    # float vs exact LLL on bagon's lattices
+
+:func:`lll` follows the L2 recipe: the basis stays exact (Python integers
+in a NumPy object array), each Gram row is computed exactly and only then
+rounded to ``long double`` for the Gram-Schmidt step, so precision is
+needed for the dimension but not for the size of the entries.  When the
+lazy size reduction stops making progress, precision has run out and the
+reduction restarts with the exact integral LLL, which is slow but never
+wrong.  Dependent generators (shift-polynomial lattices have them) are
+first turned into a basis of the same lattice by integer row echelon.
+
+This is not a vectorized reduction.  Shift-polynomial entries run to
+hundreds of bits, far past float64, so the basis is an object array:
+every row operation is a loop over Python integers and the Gram-Schmidt
+recurrence is a Python loop as well.  What it is for is the lattices
+:func:`small_roots` builds: on bagon's (256-bit modulus, 48-bit roots)
+it is about 2x faster than the exact integral LLL at ``m = 1``, 5x at
+``m = 2`` and 9x at ``m = 3``, which ``python -m saga.lattice`` measures.
+It is not a general replacement: on random knapsack lattices with entries
+below about 700 bits the exact LLL is the faster one.
+
+:func:`small_roots` builds the shift-polynomial lattice that
+``bagon/coppersmith.sage`` used and solves the reduced polynomials over
+the integers with :mod:`saga.poly`.
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+import numpy as np
+from Crypto.Util import number
+
+from saga import poly
+
+FLOAT = np.longdouble
+
+
+class PrecisionError(ArithmeticError):
+    pass
+
+
+def _round(x):
+    return int(np.rint(x))
+
+
+def _lll_float(B, delta, eta, max_passes=64):
+    n = B.shape[0]
+    r = np.zeros((n, n), dtype=FLOAT)
+    mu = np.zeros((n, n), dtype=FLOAT)
+    r[0, 0] = FLOAT(int(B[0].dot(B[0])))
+    k = 1
+    while k < n:
+        # lazy size reduction of b_k against b_0..b_(k-1)
+        for _ in range(max_passes):
+            gram = [int(g) for g in B[:k + 1].dot(B[k])]
+            for j in range(k):
+                r[k, j] = FLOAT(gram[j]) - mu[j, :j].dot(r[k, :j])
+                mu[k, j] = r[k, j] / r[j, j]
+            if np.all(np.abs(mu[k, :k]) <= eta):
+                break
+            for j in range(k - 1, -1, -1):
+                x = _round(mu[k, j])
+                if x:
+                    B[k] -= x * B[j]
+                    mu[k, :j] -= x * mu[j, :j]
+                    mu[k, j] -= x
+        else:
+            raise PrecisionError("size reduction does not converge")
+        # Lovasz test on s = r_kk + mu^2 r_(k-1)(k-1), which cancels far less
+        # than r_kk itself while b_k is still much longer than its projection
+        s_k = FLOAT(gram[k]) - mu[k, :k - 1].dot(r[k, :k - 1])
+        if delta * r[k - 1, k - 1] > s_k:
+            B[[k - 1, k]] = B[[k, k - 1]]
+            k = max(k - 1, 1)
+            if k == 1:
+                r[0, 0] = FLOAT(int(B[0].dot(B[0])))
+        else:
+            r[k, k] = s_k - mu[k, k - 1] * r[k, k - 1]
+            if r[k, k] <= 0:
+                raise PrecisionError("non-positive Gram-Schmidt norm")
+            k += 1
+    return B
+
+
+def _lll_exact(B, delta):
+    """Integral LLL (Cohen, Algorithm 2.6.7) with ``delta`` as a fraction."""
+    from fractions import Fraction
+
+    delta = Fraction(delta).limit_denominator(1 << 20)
+    B = [list(row) for row in B]
+    n = len(B)
+    dot = lambda u, v: sum(a * b for a, b in zip(u, v))
+    d = [1] + [0] * n
+    lam = [[0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1):
+            u = dot(B[i], B[j])
+            for l in range(j):
+                u = (d[l + 1] * u - lam[i][l] * lam[j][l]) // d[l]
+            if j < i:
+                lam[i][j] = u
+            else:
+                d[i + 1] = u
+                if u == 0:
+                    raise ValueError("basis rows are linearly dependent")
+
+    def reduce(k, l):
+        if 2 * abs(lam[k][l]) > d[l + 1]:
+            q = (2 * lam[k][l] + d[l + 1]) // (2 * d[l + 1])
+            B[k] = [a - q * b for a, b in zip(B[k], B[l])]
+            lam[k][l] -= q * d[l + 1]
+            for i in range(l):
+                lam[k][i] -= q * lam[l][i]
+
+    k = 1
+    while k < n:
+        reduce(k, k - 1)
+        if delta.denominator * d[k + 1] * d[k - 1] < delta.numerator * d[k] ** 2 - delta.denominator * lam[k][k - 1] ** 2:
+            B[k], B[k - 1] = B[k - 1], B[k]
+            for j in range(k - 1):
+                lam[k][j], lam[k - 1][j] = lam[k - 1][j], lam[k][j]
+            lk = lam[k][k - 1]
+            b = (d[k - 1] * d[k + 1] + lk * lk) // d[k]
+            for i in range(k + 1, n):
+                t = lam[i][k]
+                lam[i][k] = (d[k + 1] * lam[i][k - 1] - lk * t) // d[k]
+                lam[i][k - 1] = (b * t + lk * lam[i][k]) // d[k + 1]
+            d[k] = b
+            k = max(k - 1, 1)
+        else:
+            for l in range(k - 2, -1, -1):
+                reduce(k, l)
+            k += 1
+    return B
+
+
+def _rank(rows, p=(1 << 127) - 1):
+    """Rank of the integer ``rows`` modulo the prime p (their rank over Q, almost surely)."""
+    rows = [[c % p for c in row] for row in rows]
+    rank = 0
+    for col in range(len(rows[0]) if rows else 0):
+        pivot = next((i for i in range(rank, len(rows)) if rows[i][col]), None)
+        if pivot is None:
+            continue
+        rows[rank], rows[pivot] = rows[pivot], rows[rank]
+        inv = pow(rows[rank][col], -1, p)
+        for i in range(rank + 1, len(rows)):
+            c = rows[i][col] * inv % p
+            if c:
+                rows[i] = [(a - c * b) % p for a, b in zip(rows[i], rows[rank])]
+        rank += 1
+    return rank
+
+
+def row_basis(rows):
+    """A basis of the lattice spanned by the integer ``rows``, in row echelon form."""
+    rows = [list(row) for row in rows if any(row)]
+    basis = []
+    for col in range(len(rows[0]) if rows else 0):
+        # Euclid on the column, always dividing by the smallest entry
+        while True:
+            pivots = [row for row in rows if row[col]]
+            if len(pivots) < 2:
+                break
+            pivot = min(pivots, key=lambda row: abs(row[col]))
+            for row in pivots:
+                if row is not pivot:
+                    q = row[col] // pivot[col]
+                    row[:] = [a - q * b for a, b in zip(row, pivot)]
+            rows = [row for row in rows if any(row)]
+        if pivots:
+            basis.append(pivots[0])
+            rows = [row for row in rows if row is not pivots[0]]
+    return basis
+
+
+def lll(rows, delta=0.99):
+    """LLL-reduce the lattice spanned by the integer ``rows``; returns a list of lists.
+
+    The result has one row per dimension of the lattice; generators that
+    are linearly dependent do not come back as zero rows.
+    """
+    rows = [[int(c) for c in row] for row in rows]
+    if _rank(rows) < len(rows):
+        rows = row_basis(rows)
+    if len(rows) < 2:
+        return rows
+    B = np.array(rows, dtype=object)
+    try:
+        B = _lll_float(B, delta, eta=0.51)
+    except PrecisionError:
+        return _lll_exact(rows, delta)
+    return [[int(c) for c in row] for row in B]
+
+
+def _poly_mul(f, g):
+    h = {}
+    for (i, j), a in f.items():
+        for (k, l), b in g.items():
+            h[i + k, j + l] = h.get((i + k, j + l), 0) + a * b
+    return {e: c for e, c in h.items() if c}
+
+
+def _poly_pow(f, n):
+    result = {(0, 0): 1}
+    for _ in range(n):
+        result = _poly_mul(result, f)
+    return result
+
+
+def shift_polynomials(f, N, m=1, d=None):
+    """``N^(m-i) * f^i * x^s * y^t`` for ``i <= m`` and ``s, t < d``, as in coppersmith.sage."""
+    d = d or max(i + j for i, j in f)
+    polys = []
+    for i in range(m + 1):
+        base = {e: c * N ** (m - i) for e, c in _poly_pow(f, i).items()}
+        for s, t in itertools.product(range(d), repeat=2):
+            polys.append({(a + s, b + t): c for (a, b), c in base.items()})
+    return polys
+
+
+def coppersmith_lattice(f, N, X, Y, m=1, d=None):
+    """Rows of the scaled shift-polynomial lattice, with its monomials and scales."""
+    polys = shift_polynomials(f, N, m, d)
+    monomials = sorted({e for g in polys for e in g}, key=lambda e: (e[0] + e[1], e))
+    scale = [X ** i * Y ** j for i, j in monomials]
+    rows = [[g.get(e, 0) * s for e, s in zip(monomials, scale)] for g in polys]
+    return rows, monomials, scale
+
+
+def small_roots(f, N, X, Y, m=1, d=None):
+    """Integer roots ``|x| < X, |y| < Y`` of the bivariate ``f = 0 (mod N)``.
+
+    ``f`` maps exponent pairs ``(i, j)`` of ``x^i y^j`` to coefficients.
+    Returns a list of ``(x, y)`` pairs (empty if the lattice is too small).
+    """
+    rows, monomials, scale = coppersmith_lattice(f, N, X, Y, m, d)
+
+    reduced = []
+    for row in lll(rows):
+        h = {e: c // s for e, c, s in zip(monomials, row, scale) if c}
+        if h:
+            reduced.append(poly.from_terms(h))
+
+    found = set()
+    for h1, h2 in itertools.combinations(reduced, 2):
+        eliminated = poly.resultant(h1, h2)
+        if not eliminated:
+            continue
+        for x in poly.integer_roots(eliminated):
+            if abs(x) >= X:
+                continue
+            for h in (h1, h2):
+                in_y = poly.specialize(h, x)
+                if in_y:
+                    for y in poly.integer_roots(in_y):
+                        if abs(y) < Y and sum(c * x ** i * y ** j for (i, j), c in f.items()) % N == 0:
+                            found.add((x, y))
+                    break
+        if found:
+            break
+    return sorted(found)
+
+
+def benchmark(ms, bits=256, trunc=48, exact_up_to=3, rng=None):
+    """Rows of (m, dim, entry bits, :func:`lll` seconds, exact seconds or None).
+
+    The lattices are :func:`small_roots`' for a random bilinear ``f`` modulo
+    a ``bits``-bit prime with ``trunc``-bit roots, which is bagon's shape.
+    """
+    rng = rng or random.Random(0)
+    N = number.getPrime(bits, lambda n: rng.randbytes(n))
+    f = {(0, 0): rng.randrange(N), (1, 0): rng.randrange(N), (0, 1): rng.randrange(N), (1, 1): 1}
+    rows = []
+    for m in ms:
+        lattice, _, _ = coppersmith_lattice(f, N, 1 << trunc, 1 << trunc, m)
+        entry_bits = max(abs(c) for row in lattice for c in row).bit_length()
+        start = time.perf_counter()
+        reduced = lll(lattice)
+        fast = time.perf_counter() - start
+        exact = None
+        if m <= exact_up_to:
+            # the same basis lll() hands its engines
+            basis = lattice if _rank(lattice) == len(lattice) else row_basis(lattice)
+            start = time.perf_counter()
+            _lll_exact(basis, 0.99)
+            exact = time.perf_counter() - start
+        rows.append((m, len(reduced), entry_bits, fast, exact))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-m", type=int, nargs="+", default=[1, 2, 3], help="shift-polynomial powers")
+    parser.add_argument("--bits", type=int, default=256, help="size of the modulus")
+    parser.add_argument("--trunc", type=int, default=48, help="size of the roots")
+    parser.add_argument("--exact-up-to", type=int, default=3, help="largest m to run the exact LLL on")
+    args = parser.parse_args()
+
+    print(f"{'m':>3}{'dim':>5}{'bits':>6}{'lll (s)':>11}{'exact (s)':>11}{'speedup':>9}")
+    for m, dim, bits, fast, exact in benchmark(args.m, args.bits, args.trunc, args.exact_up_to):
+        tail = f"{exact:>11.3f}{exact / fast:>8.1f}x" if exact is not None else f"{'-':>11}{'-':>9}"
+        print(f"{m:>3}{dim:>5}{bits:>6}{fast:>11.3f}{tail}")
+
+
+if __name__ == "__main__":
+    main()
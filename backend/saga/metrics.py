@@ -0,0 +1,317 @@
+"""Latency histograms for the challenge hot paths and per-session counters.
+
+    python -m saga.metrics /run/saga/empoleon.sock      # or a JSON dump
+
+Challenges mark their expensive operations with
+``@metrics.timed("crawdaunt.claw_oracle")`` on a function or
+``with metrics.timed("empoleon.mul_add"):`` around a block.  A sample costs
+two ``perf_counter_ns`` calls and a few integer operations: histograms keep
+four buckets per power of two, so a quantile is off by at most a
+quarter, without storing samples.  The session drivers (``run_stdio``,
+``saga.host``, ``saga.zygote``) wrap the player's I/O in :class:`MeteredIO`,
+which counts queries per session and the time spent waiting in ``input()``.
+
+Nothing leaves the process unless asked: ``--metrics PATH`` on the servers
+(``SAGA_METRICS`` for ``run_stdio``) rewrites a JSON snapshot every
+``--metrics-interval`` seconds and at exit, and ``--metrics-socket PATH``
+answers every connection with the current snapshot.  ``{pid}`` in either
+path is replaced, for ``--workers``.  Zygote children send their numbers to
+the parent when their session ends, so the parent's export covers them.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from time import perf_counter_ns
+
+METRICS_ENV = "SAGA_METRICS"
+SUB_BITS = 2  # 2^SUB_BITS buckets per power of two
+_SUB = 1 << SUB_BITS
+
+
+def _bucket(value):
+    bits = value.bit_length()
+    if bits <= SUB_BITS + 1:
+        return value
+    return ((bits - SUB_BITS) << SUB_BITS) + ((value >> (bits - SUB_BITS - 1)) & (_SUB - 1))
+
+
+def _bucket_low(index):
+    """Smallest value that falls into bucket ``index``."""
+    if index < 2 * _SUB:
+        return index
+    bits = (index >> SUB_BITS) + SUB_BITS
+    return (_SUB + (index & (_SUB - 1))) << (bits - SUB_BITS - 1)
+
+
+class Histogram:
+    """Counts of non-negative integer samples in logarithmic buckets."""
+
+    __slots__ = ("unit", "buckets", "count", "total", "max")
+
+    def __init__(self, unit="ns"):
+        self.unit = unit
+        self.clear()
+
+    def clear(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        index = _bucket(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Upper edge of the bucket holding the ``q``-quantile sample."""
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(_bucket_low(index + 1) - 1, self.max)
+        return self.max
+
+    def to_dict(self):
+        scale = 1e-3 if self.unit == "ns" else 1
+        entry = {"unit": "us" if self.unit == "ns" else self.unit, "count": self.count}
+        if self.count:
+            entry["mean"] = self.total / self.count * scale
+            for q in (0.5, 0.9, 0.99):
+                entry[f"p{round(q * 100)}"] = self.quantile(q) * scale
+            entry["max"] = self.max * scale
+        entry["sum"] = self.total * scale
+        entry["buckets"] = {str(i): n for i, n in sorted(self.buckets.items())}
+        return entry
+
+    def merge(self, entry):
+        """Add the samples of another histogram's :meth:`to_dict`."""
+        for index, n in entry["buckets"].items():
+            index = int(index)
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.count += entry["count"]
+        scale = 1e3 if self.unit == "ns" else 1
+        self.total += round(entry["sum"] * scale)
+        if entry["count"]:
+            self.max = max(self.max, round(entry["max"] * scale))
+
+
+_histograms = {}
+_sessions = {"started": 0, "finished": 0}
+_started = time.time()
+
+
+def histogram(name, unit="ns"):
+    """The process-wide histogram called ``name``, created on first use."""
+    hist = _histograms.get(name)
+    if hist is None:
+        hist = _histograms[name] = Histogram(unit)
+    return hist
+
+
+class timed:
+    """Time a block (``with timed(name):``) or every call of a function (``@timed(name)``)."""
+
+    __slots__ = ("hist", "start")
+
+    def __init__(self, name):
+        self.hist = histogram(name)
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.add(perf_counter_ns() - self.start)
+
+    def __call__(self, fn):
+        hist = self.hist
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.add(perf_counter_ns() - start)
+
+        wrapper.__name__ = fn.__name__
+        wrapper.__qualname__ = fn.__qualname__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+
+class MeteredIO:
+    """Session I/O wrapper that counts queries and the time spent awaiting them."""
+
+    def __init__(self, io):
+        self.io = io
+        self.queries = 0
+        self.blocked = 0
+        self.opened = perf_counter_ns()
+        _sessions["started"] += 1
+
+    def print(self, *args, **kwargs):
+        self.io.print(*args, **kwargs)
+
+    async def input(self, prompt=""):
+        start = perf_counter_ns()
+        try:
+            return await self.io.input(prompt)
+        finally:
+            self.blocked += perf_counter_ns() - start
+            self.queries += 1
+
+    def close(self):
+        _sessions["finished"] += 1
+        histogram("session.queries", unit="count").add(self.queries)
+        histogram("session.input_blocked").add(self.blocked)
+        histogram("session.duration").add(perf_counter_ns() - self.opened)
+
+
+def snapshot():
+    return {
+        "pid": os.getpid(),
+        "time": time.time(),
+        "uptime_s": time.time() - _started,
+        "sessions": dict(_sessions, active=_sessions["started"] - _sessions["finished"]),
+        "operations": {name: hist.to_dict() for name, hist in sorted(list(_histograms.items()))},
+    }
+
+
+def merge(other):
+    """Fold another process's :func:`snapshot` into this one."""
+    for key in ("started", "finished"):
+        _sessions[key] += other["sessions"][key]
+    for name, entry in other["operations"].items():
+        histogram(name, "ns" if entry["unit"] == "us" else entry["unit"]).merge(entry)
+
+
+def reset():
+    """Forget everything recorded so far (a forked child starts from zero)."""
+    # in place: @timed functions hold on to their histograms
+    for hist in _histograms.values():
+        hist.clear()
+    _sessions.update(started=0, finished=0)
+
+
+def dump(path):
+    """Write a snapshot to ``path`` atomically."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot(), f)
+    os.replace(tmp, path)
+
+
+def _dump_loop(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            dump(path)
+        except OSError as err:
+            print(f"metrics: cannot write {path}: {err}", file=sys.stderr)
+
+
+def _serve_loop(server):
+    while True:
+        conn, _ = server.accept()
+        with conn:
+            try:
+                conn.sendall(json.dumps(snapshot()).encode() + b"\n")
+            except OSError:
+                pass
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def export(path=None, socket_path=None, interval=10.0):
+    """Start exporting this process's metrics; ``{pid}`` in a path is filled in.
+
+    Call it after forking: the exporters are threads.
+    """
+    if path:
+        path = path.format(pid=os.getpid())
+        atexit.register(dump, path)
+        if interval:
+            threading.Thread(target=_dump_loop, args=(path, interval), daemon=True).start()
+    if socket_path:
+        socket_path = socket_path.format(pid=os.getpid())
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(socket_path)
+        server.listen(16)
+        atexit.register(_unlink, socket_path)
+        threading.Thread(target=_serve_loop, args=(server,), daemon=True).start()
+
+
+def add_arguments(parser):
+    parser.add_argument("--metrics", metavar="PATH", help="rewrite a JSON metrics snapshot here periodically and at exit")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, metavar="SECONDS")
+    parser.add_argument("--metrics-socket", metavar="PATH", help="serve metrics snapshots on this Unix socket")
+
+
+def export_from_args(args):
+    export(args.metrics, args.metrics_socket, args.metrics_interval)
+
+
+def collect(sock):
+    """Merge every snapshot that arrives as a datagram on ``sock``, in a thread."""
+
+    def loop():
+        while True:
+            merge(json.loads(sock.recv(1 << 20)))
+
+    threading.Thread(target=loop, daemon=True).start()
+
+
+def read(source):
+    """A snapshot from a stats socket or a JSON dump."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(source)
+            chunks = []
+            while chunk := sock.recv(1 << 16):
+                chunks.append(chunk)
+        return json.loads(b"".join(chunks))
+    except OSError:
+        with open(source) as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="a --metrics-socket path or a --metrics JSON dump")
+    parser.add_argument("--json", action="store_true", help="print the raw snapshot")
+    args = parser.parse_args()
+
+    snap = read(args.source)
+    if args.json:
+        print(json.dumps(snap, indent=2))
+        return
+    sessions = snap["sessions"]
+    print(f"pid {snap['pid']}, up {snap['uptime_s']:.0f}s, sessions {sessions['started']} started, {sessions['active']} active")
+    print(f"{'operation':28}{'count':>9}{'mean':>11}{'p50':>11}{'p90':>11}{'p99':>11}{'max':>11}  unit")
+    for name, entry in snap["operations"].items():
+        if entry["count"]:
+            cols = "".join(f"{entry[k]:>11.1f}" for k in ("mean", "p50", "p90", "p99", "max"))
+            print(f"{name:28}{entry['count']:>9}{cols}  {entry['unit']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Modular arithmetic and primes on gmpy2 when it is installed.
+
+    python -m saga.nt [--bits 512 1024 2048]    # built-in vs gmpy2, per operation
+
+Every function takes and returns plain ints, so printed values, JSON and
+``long_to_bytes`` behave exactly as before; only the work in between runs
+on GMP.  Code that keeps long-lived values in a hot loop (the Loak curves)
+can hold them as :data:`mpz` instead, and ordinary operators then stay in
+gmpy2 too.  Without gmpy2 every function is the built-in or PyCryptodome
+equivalent and :data:`mpz` is ``int``.
+"""
+
+import argparse
+import math
+import random
+import time
+
+from Crypto import Random
+from Crypto.Util import number
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+PRIME_ROUNDS = 25
+
+
+def _py_powmod(base, exp, mod):
+    return pow(base, exp, mod)
+
+
+def _py_invert(a, mod):
+    return pow(a, -1, mod)
+
+
+def _py_is_prime(n):
+    return number.isPrime(n)
+
+
+def _py_isqrt(n):
+    return math.isqrt(n)
+
+
+def _random_odd(bits, randfunc):
+    n = int.from_bytes(randfunc((bits + 7) // 8), "big") >> (-bits % 8)
+    return n | 1 << (bits - 1) | 1
+
+
+def _py_get_prime(bits, randfunc=None):
+    return number.getPrime(bits, randfunc)
+
+
+if gmpy2 is not None:
+    mpz = gmpy2.mpz
+
+    def _gmp_powmod(base, exp, mod):
+        return int(gmpy2.powmod(base, exp, mod))
+
+    def _gmp_invert(a, mod):
+        try:
+            return int(gmpy2.invert(a, mod))
+        except ZeroDivisionError:
+            raise ValueError("base is not invertible for the given modulus") from None
+
+    def _gmp_is_prime(n):
+        return n > 1 and bool(gmpy2.is_prime(n, PRIME_ROUNDS))
+
+    def _gmp_isqrt(n):
+        return int(gmpy2.isqrt(n))
+
+    def _gmp_get_prime(bits, randfunc=None):
+        if bits < 2:
+            raise ValueError("a prime needs at least 2 bits")
+        if bits == 2:
+            return _py_get_prime(bits, randfunc)
+        # same sampling as Crypto.Util.number.getPrime: random odd bits-bit
+        # candidates; Random.get_random_bytes is looked up per call on purpose
+        randfunc = randfunc or Random.get_random_bytes
+        while True:
+            n = _random_odd(bits, randfunc)
+            if gmpy2.is_prime(n, PRIME_ROUNDS):
+                return n
+
+    powmod, invert, is_prime, isqrt, get_prime = _gmp_powmod, _gmp_invert, _gmp_is_prime, _gmp_isqrt, _gmp_get_prime
+else:
+    mpz = int
+    powmod, invert, is_prime, isqrt, get_prime = _py_powmod, _py_invert, _py_is_prime, _py_isqrt, _py_get_prime
+
+
+def legendre(a, p):
+    """The Legendre symbol of a modulo the odd prime p, as -1, 0 or 1."""
+    if gmpy2 is not None:
+        return int(gmpy2.legendre(a, p))
+    s = pow(a, (p - 1) // 2, p)
+    return -1 if s == p - 1 else s
+
+
+def _timeit(fn, args, budget=0.2):
+    """Seconds per call of ``fn`` over the argument tuples ``args``."""
+    calls, start = 0, time.perf_counter()
+    while True:
+        for a in args:
+            fn(*a)
+        calls += len(args)
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget:
+            return elapsed / calls
+
+
+def benchmark(bits_list, budget=0.2, rng=None):
+    """Rows of (operation, bits, built-in seconds, gmpy2 seconds) per call."""
+    if gmpy2 is None:
+        raise RuntimeError("gmpy2 is not installed")
+    rng = rng or random.Random(0)
+    rows = []
+    for bits in bits_list:
+        mods = [rng.getrandbits(bits) | 1 << (bits - 1) | 1 for _ in range(8)]
+        pairs = [(rng.randrange(m), m) for m in mods]
+        primes = [number.getPrime(bits, lambda n: rng.randbytes(n)) for _ in range(2)]
+        randfunc = lambda n: rng.randbytes(n)
+        cases = [
+            ("powmod", [(x, rng.getrandbits(bits), m) for x, m in pairs], _py_powmod, _gmp_powmod),
+            ("powmod e=65537", [(x, 65537, m) for x, m in pairs], _py_powmod, _gmp_powmod),
+            ("invert", pairs, _py_invert, _gmp_invert),
+            ("is_prime", [(p,) for p in primes], _py_is_prime, _gmp_is_prime),
+            ("isqrt", [(x * x,) for x, _ in pairs], _py_isqrt, _gmp_isqrt),
+        ]
+        if bits <= 1024:
+            cases.append(("get_prime", [(bits, randfunc)], _py_get_prime, _gmp_get_prime))
+        for name, args, py, gmp in cases:
+            if name == "invert":
+                args = [(x, m) for x, m in args if math.gcd(x, m) == 1]
+            rows.append((name, bits, _timeit(py, args, budget), _timeit(gmp, args, budget)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bits", type=int, nargs="+", default=[256, 512, 1024, 2048])
+    parser.add_argument("--budget", type=float, default=0.2, help="seconds per measurement")
+    args = parser.parse_args()
+
+    print(f"{'operation':16}{'bits':>6}{'int (us)':>12}{'gmpy2 (us)':>12}{'speedup':>9}")
+    for name, bits, py, gmp in benchmark(args.bits, args.budget):
+        print(f"{name:16}{bits:>6}{py * 1e6:>12.1f}{gmp * 1e6:>12.1f}{py / gmp:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Pipelined client for line-based decryption oracles.
+
+The LSB-style solvers know every ciphertext they are going to send before the
+first reply arrives, so instead of one ``sendlineafter``/``recvline`` round
+trip per query the queries are written in batches and the replies are read
+back as a stream.  Every reply is framed by bytes that the server prints
+verbatim, and those bytes are checked on the way in so a dropped or extra
+reply is reported instead of silently shifting every later answer.
+"""
+
+
+class OracleDesync(Exception):
+    pass
+
+
+class PipelinedOracle:
+    """Query an oracle over ``io`` with up to ``window`` queries in flight.
+
+    ``io`` is anything with ``send``, ``recvn`` and ``recvline`` (a pwntools
+    tube).  ``encode`` turns a query into the exact bytes to send, ``decode``
+    turns the reply line into a value.  ``lead`` is what the server prints
+    between reading a query and writing its answer (menu, prompt and reply
+    prefix) and ``tail`` is whatever follows the answer line.
+    """
+
+    def __init__(self, io, encode, decode, lead, tail=b"", window=128):
+        if window < 1:
+            raise ValueError("window must be positive")
+        self.io = io
+        self.encode = encode
+        self.decode = decode
+        self.lead = lead
+        self.tail = tail
+        self.window = window
+        self.sent = 0
+        self.received = 0
+        self.batches = 0
+
+    @property
+    def in_flight(self):
+        return self.sent - self.received
+
+    def _expect(self, expected):
+        got = self.io.recvn(len(expected))
+        if got != expected:
+            raise OracleDesync(f"reply {self.received}: expected {expected!r}, got {got!r}")
+
+    def _recv(self):
+        index = self.received
+        self._expect(self.lead)
+        line = self.io.recvline()
+        if self.tail:
+            self._expect(self.tail)
+        try:
+            value = self.decode(line.rstrip(b"\n"))
+        except ValueError as err:
+            raise OracleDesync(f"reply {index}: cannot decode {line!r}") from err
+        self.received += 1
+        return value
+
+    def stream(self, queries):
+        """Yield the reply to each query in ``queries``, in order.
+
+        Queries are pulled lazily, so ``queries`` may be a generator, but it
+        must not depend on replies that have not been yielded yet.  Replies
+        to queries that were sent but never consumed are left on the wire.
+        """
+        self.drain()
+        queries = iter(queries)
+        exhausted = False
+        while True:
+            in_flight = self.in_flight
+            if not exhausted and in_flight <= self.window // 2:
+                batch = []
+                while in_flight + len(batch) < self.window:
+                    try:
+                        batch.append(self.encode(next(queries)))
+                    except StopIteration:
+                        exhausted = True
+                        break
+                if batch:
+                    self.io.send(b"".join(batch))
+                    self.sent += len(batch)
+                    self.batches += 1
+                    in_flight += len(batch)
+            if not in_flight:
+                return
+            yield self._recv()
+
+    def drain(self):
+        """Read and drop replies left over from an abandoned stream."""
+        while self.in_flight:
+            self._recv()
+
+    def query_many(self, queries):
+        return list(self.stream(queries))
+
+    def query(self, query):
+        return self.query_many([query])[0]
+
+
+def kary_search(oracle, low, high, query, k=2):
+    """Return the smallest x in ``[low, high + 1]`` whose reply is true.
+
+    Replies must be monotone in x (false up to some point, true after it),
+    with ``high + 1`` taken as true.  Each round sends up to ``k - 1``
+    probes as one pipelined batch and narrows the interval k-ways, so the
+    search costs about ``log_k(high - low)`` round trips instead of
+    ``log_2``, at the price of more oracle work per round.
+    """
+    if k < 2:
+        raise ValueError("k must be at least 2")
+    while low <= high:
+        span = high - low + 1
+        points = sorted({low + span * i // k for i in range(1, k)})
+        for x, hit in zip(points, oracle.stream(query(x) for x in points)):
+            if hit:
+                high = x - 1
+                break
+            low = x + 1
+    return low
@@ -0,0 +1,270 @@
+"""Dense integer polynomials: resultants and integer roots without Sage.
+
+A polynomial in Z[x] is a list of coefficients, constant term first, with
+no trailing zeros (``[]`` is zero).  A bivariate polynomial is a list of
+such lists: ``f[j]`` is the coefficient of ``y^j`` as a polynomial in x,
+so :func:`resultant` eliminates y and returns a polynomial in x.
+
+The resultant uses the subresultant PRS, which keeps every intermediate
+in Z[x] with exact divisions, so coefficients only grow as far as the
+resultant itself.  Integer roots come from roots modulo a small prime,
+Newton-lifted p-adically past the root bound, so the cost is a handful of
+modular evaluations rather than real root isolation on huge coefficients.
+Coefficients are :data:`saga.nt.mpz`, gmpy2 integers when gmpy2 is installed.
+"""
+
+from math import gcd
+
+from saga.nt import mpz
+
+
+def trim(f):
+    f = list(f)
+    while f and not f[-1]:
+        f.pop()
+    return f
+
+
+def degree(f):
+    return len(f) - 1
+
+
+def add(f, g):
+    if len(f) < len(g):
+        f, g = g, f
+    h = list(f)
+    for i, c in enumerate(g):
+        h[i] += c
+    return trim(h)
+
+
+def sub(f, g):
+    return add(f, [-c for c in g])
+
+
+def scale(f, c):
+    return trim([a * c for a in f]) if c else []
+
+
+def mul(f, g):
+    if not f or not g:
+        return []
+    h = [0] * (len(f) + len(g) - 1)
+    for i, a in enumerate(f):
+        if a:
+            for j, b in enumerate(g):
+                h[i + j] += a * b
+    return trim(h)
+
+
+def power(f, n):
+    result = [mpz(1)]
+    while n:
+        if n & 1:
+            result = mul(result, f)
+        n >>= 1
+        if n:
+            f = mul(f, f)
+    return result
+
+
+def div_exact(f, g):
+    """``f / g`` in Z[x]; raises ValueError if g does not divide f."""
+    f = list(f)
+    q = [0] * max(len(f) - len(g) + 1, 0)
+    lead = g[-1]
+    for i in range(len(q) - 1, -1, -1):
+        c, r = divmod(f[i + len(g) - 1], lead)
+        if r:
+            raise ValueError("inexact division")
+        q[i] = c
+        if c:
+            for j, b in enumerate(g):
+                f[i + j] -= c * b
+    if any(f):
+        raise ValueError("inexact division")
+    return trim(q)
+
+
+def evaluate(f, x, mod=None):
+    """Horner evaluation of f at x, optionally reduced modulo ``mod``."""
+    result = 0
+    for c in reversed(f):
+        result = result * x + c
+        if mod is not None:
+            result %= mod
+    return result
+
+
+def derivative(f):
+    return trim([i * c for i, c in enumerate(f)][1:])
+
+
+def content(f):
+    g = 0
+    for c in f:
+        g = gcd(g, c)
+    return mpz(g)
+
+
+def primitive(f):
+    """f divided by its content, with a positive leading coefficient."""
+    g = content(f)
+    if f and f[-1] < 0:
+        g = -g
+    return [c // g for c in f] if f else []
+
+
+def from_terms(terms):
+    """Bivariate polynomial from ``{(i, j): c}`` meaning ``c * x^i * y^j``."""
+    f = [[] for _ in range(max(j for _, j in terms) + 1)]
+    for (i, j), c in terms.items():
+        f[j] = add(f[j], [0] * i + [mpz(c)])
+    return trim_outer(f)
+
+
+def trim_outer(f):
+    f = list(f)
+    while f and not f[-1]:
+        f.pop()
+    return f
+
+
+def specialize(f, x):
+    """Substitute x into a bivariate polynomial, leaving a polynomial in y."""
+    return trim([evaluate(c, x) for c in f])
+
+
+def _prem(a, b):
+    """Pseudo-remainder of ``lc(b)^(deg a - deg b + 1) * a`` by b, over Z[x]."""
+    lead = b[-1]
+    r = list(a)
+    e = len(a) - len(b) + 1
+    while len(r) >= len(b):
+        top, shift = r[-1], len(r) - len(b)
+        r = [mul(c, lead) for c in r]
+        for i, c in enumerate(b):
+            r[shift + i] = sub(r[shift + i], mul(top, c))
+        r = trim_outer(r)
+        e -= 1
+    factor = power(lead, e)
+    return [mul(c, factor) for c in r]
+
+
+def resultant(f, g):
+    """Resultant of two bivariate polynomials with respect to y (Cohen, Alg. 3.3.7)."""
+    if not f or not g:
+        return []
+    sign = 1
+    if len(f) < len(g):
+        f, g = g, f
+        if degree(f) & degree(g) & 1:
+            sign = -1
+    one = [mpz(1)]
+    lead_g, h = one, one
+    while len(g) > 1:
+        delta = len(f) - len(g)
+        if degree(f) & degree(g) & 1:
+            sign = -sign
+        r = _prem(f, g)
+        f = g
+        divisor = mul(lead_g, power(h, delta))
+        g = trim_outer([div_exact(c, divisor) for c in r])
+        if not g:
+            return []
+        lead_g = f[-1]
+        if delta:
+            h = div_exact(power(lead_g, delta), power(h, delta - 1))
+    d = degree(f)
+    h = div_exact(power(g[-1], d), power(h, d - 1)) if d else one
+    return scale(h, sign)
+
+
+def resultant_univariate(f, g):
+    """Resultant of two polynomials in Z[x], as an integer."""
+    r = resultant([[c] if c else [] for c in f], [[c] if c else [] for c in g])
+    return r[0] if r else 0
+
+
+def _gcd_mod(f, g, m):
+    """Monic gcd of f and g over GF(m), m prime."""
+    a, b = trim(c % m for c in f), trim(c % m for c in g)
+    while b:
+        inv = pow(b[-1], -1, m)
+        while len(a) >= len(b):
+            c, shift = a[-1] * inv % m, len(a) - len(b)
+            for i, x in enumerate(b):
+                a[shift + i] = (a[shift + i] - c * x) % m
+            a = trim(a)
+        a, b = b, a
+    inv = pow(a[-1], -1, m)
+    return [c * inv % m for c in a]
+
+
+_CHECK_PRIME = (1 << 255) - 19
+
+
+def squarefree(f):
+    """The primitive square-free part of a non-constant polynomial in Z[x]."""
+    f = primitive(f)
+    df = derivative(f)
+    # a gcd that is trivial modulo a prime not dividing lc(f) is trivial over Z
+    if f[-1] % _CHECK_PRIME and len(_gcd_mod(f, df, _CHECK_PRIME)) == 1:
+        return f
+    a, b = f, primitive(df)
+    while b:
+        a, b = b, primitive(_prem_int(a, b))
+    return primitive(div_exact(f, a)) if degree(a) > 0 else f
+
+
+def _prem_int(a, b):
+    r = _prem([[c] if c else [] for c in a], [[c] if c else [] for c in b])
+    return [c[0] if c else 0 for c in r]
+
+
+def _small_primes():
+    p = 3
+    while True:
+        if all(p % d for d in range(3, int(p ** 0.5) + 1, 2)):
+            yield p
+        p += 2
+
+
+def integer_roots(f):
+    """All integer roots of f in Z[x], in increasing order."""
+    f = trim(mpz(c) for c in f)
+    if not f:
+        raise ValueError("the zero polynomial has every integer as a root")
+    roots = set()
+    while len(f) > 1 and not f[0]:
+        roots.add(0)
+        f = f[1:]
+    if len(f) <= 1:
+        return sorted(roots)
+    f = squarefree(f)
+    df = derivative(f)
+    # Fujiwara: every root is below 2 * max |a_(n-i) / a_n|^(1/i)
+    n, top = degree(f), int(f[-1]).bit_length()
+    bits = max(-(-(int(f[n - i]).bit_length() - top + 1) // i) for i in range(1, n + 1))
+    bound = min(abs(f[0]), 1 << (max(bits, 0) + 1))
+
+    for p in _small_primes():
+        if f[-1] % p == 0:
+            continue
+        residues = [r for r in range(p) if evaluate(f, r, p) == 0]
+        if all(evaluate(df, r, p) for r in residues):
+            break
+
+    modulus = p
+    while modulus <= 2 * bound:
+        modulus *= modulus
+    for r in residues:
+        m = p
+        while m < modulus:
+            m = min(m * m, modulus)
+            r = (r - evaluate(f, r, m) * pow(evaluate(df, r, m), -1, m)) % m
+        if r > m // 2:
+            r -= m
+        if abs(r) <= bound and evaluate(f, r) == 0:
+            roots.add(int(r))
+    return sorted(roots)
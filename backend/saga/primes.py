@@ -0,0 +1,173 @@
+"""Pre-generated primes, handed out once each from a memory-mapped pool.
+
+    python -m saga.primes 512 --low 64 --high 256
+
+Generating a 512-bit prime takes tens of milliseconds and a 1024-bit one
+several hundred, which used to sit between a connection and its first
+prompt.  The pool keeps one ring file per size, ``<primes>/<bits>.bin``;
+the service above keeps each between ``--low`` and ``--high`` entries with
+a process pool, and :func:`getPrime` pops one under a ``lockf`` lock, so
+every prime goes to exactly one caller across all worker processes.  When
+a pool is empty or missing it quietly generates the prime inline, with
+:func:`saga.nt.get_prime` (gmpy2 when installed).  Only the interactive
+sessions draw from it; the static generators make a few primes per
+instance off the matchmaking path and keep PyCryptodome's ``getPrime``.
+"""
+
+import argparse
+import contextlib
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from multiprocessing import Pool
+
+from saga import nt
+from saga.session import CHALLENGES_DIR
+
+PRIMES_DIR = os.path.join(os.path.dirname(CHALLENGES_DIR), "primes")
+MAGIC = b"SAGAPRM1"
+HEADER = struct.Struct("<8sIIQQ")  # magic, bits, capacity, head, tail
+CAPACITY = 1024
+
+
+class PrimePool:
+    """A ring of ``capacity`` fixed-width primes in ``<directory>/<bits>.bin``.
+
+    ``head`` and ``tail`` only ever grow; slot ``i % capacity`` holds entry
+    ``i``, and ``tail - head`` entries are ready.  Every access to them
+    holds an exclusive ``lockf`` lock, which (unlike ``flock``) is not
+    shared with forked children.
+    """
+
+    def __init__(self, bits, directory=PRIMES_DIR, capacity=CAPACITY):
+        if bits % 8:
+            raise ValueError("bits must be a multiple of 8")
+        self.bits = bits
+        self.width = bits // 8
+        self.path = os.path.join(directory, f"{bits}.bin")
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            if os.fstat(self.fd).st_size == 0:
+                os.ftruncate(self.fd, HEADER.size + capacity * self.width)
+                os.pwrite(self.fd, HEADER.pack(MAGIC, bits, capacity, 0, 0), 0)
+        self.map = mmap.mmap(self.fd, 0)
+        magic, file_bits, self.capacity, _, _ = HEADER.unpack_from(self.map)
+        if magic != MAGIC or file_bits != bits:
+            raise ValueError(f"{self.path} is not a {bits}-bit prime pool")
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with self.lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN)
+
+    def _slot(self, i):
+        start = HEADER.size + (i % self.capacity) * self.width
+        return slice(start, start + self.width)
+
+    def __len__(self):
+        with self._locked():
+            _, _, _, head, tail = HEADER.unpack_from(self.map)
+        return tail - head
+
+    def take(self):
+        """Pop one prime, or ``None`` if the pool is empty."""
+        with self._locked():
+            magic, bits, capacity, head, tail = HEADER.unpack_from(self.map)
+            if head == tail:
+                return None
+            slot = self._slot(head)
+            prime = int.from_bytes(self.map[slot], "big")
+            self.map[slot] = bytes(self.width)
+            HEADER.pack_into(self.map, 0, magic, bits, capacity, head + 1, tail)
+        return prime
+
+    def put(self, primes):
+        """Append as many of ``primes`` as fit; return how many were stored."""
+        stored = 0
+        with self._locked():
+            magic, bits, capacity, head, tail = HEADER.unpack_from(self.map)
+            for prime in primes:
+                if tail - head >= capacity:
+                    break
+                self.map[self._slot(tail)] = prime.to_bytes(self.width, "big")
+                tail += 1
+                stored += 1
+            HEADER.pack_into(self.map, 0, magic, bits, capacity, head, tail)
+        return stored
+
+
+_pools = {}
+
+
+def _pool(bits):
+    """This process's handle on the ``bits`` pool, or ``None`` if there is none."""
+    key = (os.getpid(), bits)
+    if key not in _pools:
+        path = os.path.join(PRIMES_DIR, f"{bits}.bin")
+        _pools[key] = PrimePool(bits) if os.path.exists(path) else None
+    return _pools[key]
+
+
+def getPrime(N, randfunc=None):
+    """Drop-in for ``Crypto.Util.number.getPrime`` that serves from the pool first.
+
+    A ``randfunc`` asks for primes from that source, so it bypasses the pool.
+    """
+    if randfunc is None:
+        pool = _pool(N)
+        prime = pool.take() if pool is not None else None
+        if prime is not None:
+            return prime
+    return nt.get_prime(N, randfunc)
+
+
+def _background():
+    os.nice(10)
+
+
+def refill(workers, pools, low, high):
+    """Bring every pool under ``low`` back up to ``high``; return how many were made."""
+    made = 0
+    for pool in pools:
+        missing = high - len(pool)
+        if len(pool) >= low or missing <= 0:
+            continue
+        for prime in workers.imap_unordered(nt.get_prime, [pool.bits] * missing):
+            made += pool.put([prime])
+    return made
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("bits", nargs="*", type=int, default=[512])
+    parser.add_argument("--low", type=int, default=64)
+    parser.add_argument("--high", type=int, default=256)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between watermark checks")
+    parser.add_argument("--once", action="store_true", help="fill every pool to --high and exit")
+    args = parser.parse_args()
+    if args.high > CAPACITY or not args.once and not 0 <= args.low <= args.high:
+        parser.error(f"need 0 <= --low <= --high <= {CAPACITY}")
+
+    pools = [PrimePool(bits) for bits in args.bits]
+    low = args.high if args.once else args.low
+    with Pool(args.processes, initializer=_background) as workers:
+        while True:
+            if refill(workers, pools, low, args.high):
+                print("primes:", ", ".join(f"{pool.bits}={len(pool)}" for pool in pools), flush=True)
+            if args.once:
+                break
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Scalar multiplication for commutative groups given only by their operation.
+
+Both helpers take the group law as a plain function on raw values (tuples
+of ints, not element objects) so inner loops avoid per-step allocation of
+wrapper objects.  Neither needs inverses, so they also work in the
+challenge structures that are rings rather than groups.
+"""
+
+
+def window_pow(op, base, n, identity, width=4):
+    """Left-to-right sliding-window ``base * n`` under ``op``; ``n <= 0`` gives ``identity``."""
+    if n <= 0:
+        return identity
+    if n.bit_length() <= 2 * width:
+        width = 1
+    odd = [base]
+    if width > 1:
+        square = op(base, base)
+        for _ in range((1 << (width - 1)) - 1):
+            odd.append(op(odd[-1], square))
+
+    result = None
+    i = n.bit_length() - 1
+    while i >= 0:
+        if not (n >> i) & 1:
+            if result is not None:
+                result = op(result, result)
+            i -= 1
+            continue
+        low = max(i - width + 1, 0)
+        while not (n >> low) & 1:
+            low += 1
+        digit = (n >> low) & ((1 << (i - low + 1)) - 1)
+        if result is not None:
+            for _ in range(i - low + 1):
+                result = op(result, result)
+            result = op(result, odd[digit >> 1])
+        else:
+            result = odd[digit >> 1]
+        i = low - 1
+    return result
+
+
+class Comb:
+    """Single-table comb (Lim–Lee) for scalars up to ``bits`` bits.
+
+    The scalar is cut into ``teeth`` blocks of ``d = ceil(bits / teeth)``
+    bits and ``table[j]`` holds the sum of ``2^(i*d) * base`` over the set
+    bits ``i`` of ``j``.  Building costs about ``bits`` doublings plus
+    ``2^teeth`` additions, about half of a per-window table of
+    ``j * 2^(4i) * base`` at the same per-multiplication cost (``d``
+    doublings and at most ``d`` additions), so it suits bases that only
+    live for a few dozen multiplications.  Larger scalars fall back to
+    :func:`window_pow`.
+    """
+
+    def __init__(self, op, base, bits, identity, teeth=7):
+        self.op = op
+        self.base = base
+        self.identity = identity
+        self.bits = bits
+        self.teeth = teeth
+        self.d = -(-bits // teeth)
+        spaced = [base]
+        for _ in range(teeth - 1):
+            point = spaced[-1]
+            for _ in range(self.d):
+                point = op(point, point)
+            spaced.append(point)
+        self.table = [None, base]
+        for i in range(1, teeth):
+            self.table.append(spaced[i])
+            for j in range(1, 1 << i):
+                self.table.append(op(self.table[j], spaced[i]))
+
+    def pow(self, n):
+        if n <= 0:
+            return self.identity
+        if n.bit_length() > self.bits:
+            return window_pow(self.op, self.base, n, self.identity)
+        op, table, d = self.op, self.table, self.d
+        mask = (1 << d) - 1
+        blocks = [(n >> (i * d)) & mask for i in range(self.teeth)]
+        result = None
+        for c in range(d - 1, -1, -1):
+            if result is not None:
+                result = op(result, result)
+            j = 0
+            for i, block in enumerate(blocks):
+                j |= ((block >> c) & 1) << i
+            if j:
+                result = table[j] if result is None else op(result, table[j])
+        return result
@@ -0,0 +1,167 @@
+"""Session I/O for the interactive challenge servers.
+
+Every interactive ``chall.py`` exposes its per-connection logic as
+``async def session(io)`` and talks to the player only through ``io.print``
+and ``await io.input(prompt)``.  Run directly, the session is driven over
+stdin/stdout exactly like the old blocking script; under ``saga.host`` the
+same coroutine is driven over an asyncio TCP stream, one task per player.
+The ``chall.py`` files are also the player handouts, which ship without
+this package, so they import ``saga`` inside ``try`` and fall back to
+small local stand-ins (a blocking ``run_stdio``, plain ``pow``) when it is
+missing; the hosts, the benchmark and the validator put ``backend`` on
+``sys.path`` themselves.
+Each I/O class takes a ``timeout``: a line that takes longer than that to
+arrive raises ``TimeoutError``, which :mod:`saga.governor` turns into the
+end of the session.
+"""
+
+import asyncio
+import importlib.util
+import os
+import signal
+import sys
+
+from saga import governor, metrics
+
+CHALLENGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "challenges")
+
+
+def _strip_newline(line):
+    if line.endswith("\n"):
+        line = line[:-1]
+    if line.endswith("\r"):
+        line = line[:-1]
+    return line
+
+
+def _alarm(signum, frame):
+    raise TimeoutError("no input")
+
+
+class StdioSession:
+    """Blocking stdin/stdout I/O, byte-for-byte what ``print``/``input`` do.
+
+    The timeout is a ``SIGALRM``, so it only works on the main thread.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+
+    def print(self, *args, sep=" ", end="\n"):
+        print(*args, sep=sep, end=end)
+
+    async def input(self, prompt=""):
+        if not self.timeout:
+            return input(prompt)
+        previous = signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, self.timeout)
+        try:
+            return input(prompt)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+class StreamSession:
+    """I/O over an asyncio ``StreamReader``/``StreamWriter`` pair."""
+
+    def __init__(self, reader, writer, timeout=None):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+
+    def print(self, *args, sep=" ", end="\n"):
+        self.writer.write((sep.join(map(str, args)) + end).encode())
+
+    async def _readline(self):
+        # a player who stops reading stalls drain(), so it is timed too
+        await self.writer.drain()
+        return await self.reader.readline()
+
+    async def input(self, prompt=""):
+        if prompt:
+            self.writer.write(prompt.encode())
+        try:
+            line = await asyncio.wait_for(self._readline(), self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("no input") from None
+        if not line:
+            raise EOFError("EOF when reading a line")
+        return _strip_newline(line.decode())
+
+
+class FileSession:
+    """Blocking I/O over binary file objects such as ``socket.makefile``.
+
+    There is no timeout parameter: set one on the socket instead.
+    """
+
+    def __init__(self, rfile, wfile):
+        self.rfile = rfile
+        self.wfile = wfile
+
+    def print(self, *args, sep=" ", end="\n"):
+        self.wfile.write((sep.join(map(str, args)) + end).encode())
+
+    async def input(self, prompt=""):
+        if prompt:
+            self.wfile.write(prompt.encode())
+        self.wfile.flush()
+        line = self.rfile.readline()
+        if not line:
+            raise EOFError("EOF when reading a line")
+        return _strip_newline(line.decode())
+
+
+def run_blocking(session, io):
+    """Run ``session`` on a blocking ``io`` without an event loop.
+
+    Blocking sessions never suspend, so the coroutine runs to completion in
+    a single step and signals such as ``KeyboardInterrupt`` reach the
+    challenge code exactly as they did in the old blocking scripts.
+    """
+    coro = session(io)
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("session awaited something other than input()")
+
+
+def run_stdio(session):
+    """Run ``session`` on stdin/stdout; a non-zero return is the exit status.
+
+    The session runs under its :mod:`saga.governor` limits.  With
+    ``SAGA_METRICS`` set, the session's metrics are dumped there at exit.
+    """
+    if os.environ.get(metrics.METRICS_ENV):
+        metrics.export(os.environ[metrics.METRICS_ENV], interval=None)
+    limits = governor.limits_of(session)
+    governor.cap_process_cpu(limits)
+    io = metrics.MeteredIO(StdioSession(limits.idle_s))
+    try:
+        status = run_blocking(session, governor.GovernedIO(io, limits))
+    except governor.SessionLimit:
+        status = 0
+    finally:
+        io.close()
+    if status:
+        sys.exit(status)
+
+
+def load_challenge(name, challenges_dir=CHALLENGES_DIR):
+    """Import ``<challenges_dir>/<name>/chall.py`` without starting a session.
+
+    The process is moved into the challenge directory first, since the
+    challenges open ``flag.txt`` and import their helpers relative to it.
+    """
+    path = os.path.join(challenges_dir, name)
+    os.chdir(path)
+    sys.path.insert(0, path)
+    spec = importlib.util.spec_from_file_location(f"chall_{name}", os.path.join(path, "chall.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, "session"):
+        raise ValueError(f"{name} is not an interactive challenge")
+    return module
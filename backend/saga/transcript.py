@@ -0,0 +1,298 @@
+"""Binary transcripts of oracle sessions and a tube that replays them.
+
+    SAGA_RECORD=shroomish.sgt python3 solve.py    # against chall.py, keeping every byte
+    SAGA_REPLAY=shroomish.sgt python3 solve.py    # no chall.py, the replies come from the file
+    python -m saga.transcript shroomish.sgt [--dump]
+
+Solvers open the challenge with :func:`process` instead of pwntools'.
+Under ``SAGA_RECORD`` it is the ordinary pwntools process with its raw
+``send``/``recv`` tapped, so everything on the wire lands in the
+transcript whichever tube method the solver used.  Under ``SAGA_REPLAY``
+no process is started; a :class:`Replay` answers from the transcript
+instead, slicing its replies out of the mapped file.
+
+A transcript is ``MAGIC`` followed by records: a little-endian ``u32``
+whose top bit says who wrote the bytes (set: the solver) and whose low
+bits are the length, then the bytes themselves.  Consecutive chunks in
+one direction share a record, so a pipelined session of thousands of
+queries is a handful of records.  :class:`Replay` maps the file, walks
+the headers once and keeps the mapping open until it is closed, so
+neither direction is copied into memory.
+
+The replay is strict: every byte the solver sends must match what it
+sent while recording, and it cannot read a reply before sending the
+query the server was answering, which is a deadlock in a live session.
+Either is a :class:`TranscriptMismatch`; the end of the recorded
+replies is ``EOFError``, as from a tube whose process exited.
+"""
+
+import argparse
+import atexit
+import bisect
+import mmap
+import os
+import struct
+
+RECORD_ENV = "SAGA_RECORD"
+REPLAY_ENV = "SAGA_REPLAY"
+MAGIC = b"SGT1"
+HEADER = struct.Struct("<I")
+SENT = 1 << 31  # header bit for bytes the solver sent; the low bits are the length
+
+
+class TranscriptMismatch(Exception):
+    pass
+
+
+def _bytes(data):
+    return data.encode() if isinstance(data, str) else bytes(data)
+
+
+class Writer:
+    """Append-only transcript; consecutive chunks in one direction share a record."""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.sent = False
+        self.pending = bytearray()
+
+    def _flush_record(self):
+        flag = SENT if self.sent else 0
+        for start in range(0, len(self.pending), SENT - 1):
+            chunk = self.pending[start:start + SENT - 1]
+            self.file.write(HEADER.pack(flag | len(chunk)))
+            self.file.write(chunk)
+        self.pending.clear()
+
+    def add(self, sent, data):
+        if not data:
+            return
+        if sent != self.sent:
+            self._flush_record()
+            self.sent = sent
+        self.pending += data
+
+    def close(self):
+        if not self.file.closed:
+            self._flush_record()
+            self.file.close()
+
+
+def records(buffer):
+    """Yield ``(sent, payload)`` for every record of a transcript held in ``buffer``."""
+    view = memoryview(buffer)
+    if view[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a saga transcript")
+    offset = len(MAGIC)
+    while offset < len(view):
+        (header,) = HEADER.unpack_from(view, offset)
+        offset += HEADER.size
+        length = header & (SENT - 1)
+        if offset + length > len(view):
+            raise ValueError(f"transcript truncated at byte {offset}")
+        yield bool(header & SENT), view[offset:offset + length]
+        offset += length
+
+
+def record(io, path):
+    """Copy every byte a pwntools tube sends and receives into ``path``; returns ``io``.
+
+    The transcript is complete once ``io`` is closed, or at exit.
+    """
+    writer = Writer(path)
+    send_raw, recv_raw = io.send_raw, io.recv_raw
+
+    def recording_send(data):
+        send_raw(data)
+        writer.add(True, data)
+
+    def recording_recv(numb):
+        data = recv_raw(numb)
+        writer.add(False, data)
+        return data
+
+    def recording_close():
+        writer.close()
+        close()
+
+    close = io.close
+    io.send_raw, io.recv_raw, io.close = recording_send, recording_recv, recording_close
+    atexit.register(writer.close)
+    return io
+
+
+class Replay:
+    """A tube that plays back the server side of a transcript.
+
+    It has the pwntools methods the solvers use (``send``, ``sendline``,
+    ``sendafter``, ``sendlineafter``, ``recv``, ``recvn``, ``recvline``,
+    ``recvuntil``, ``recvall``), so it can stand in for ``io`` anywhere,
+    :class:`saga.oracle.PipelinedOracle` included.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # each direction is a stream: record i holds stream bytes
+        # starts[i]:starts[i + 1], found at offsets[i] in the file
+        self._received = ([], [])
+        self._sent = ([], [])
+        # bytes up to ends[i] came after the solver had sent required[i]
+        self._ends, self._required = [], []
+        total = {True: 0, False: 0}
+        offset = len(MAGIC)
+        for is_sent, payload in records(self._map):
+            offset += HEADER.size
+            starts, offsets = self._sent if is_sent else self._received
+            starts.append(total[is_sent])
+            offsets.append(offset)
+            total[is_sent] += len(payload)
+            offset += len(payload)
+            payload.release()
+            if not is_sent:
+                self._ends.append(total[False])
+                self._required.append(total[True])
+        self._received[0].append(total[False])
+        self._sent[0].append(total[True])
+        self.pos = 0
+        self.sent = 0
+        self._limit = self._available()
+
+    def _slice(self, stream, lo, hi):
+        """Bytes ``lo:hi`` of one direction, gathered from the records holding them."""
+        starts, offsets = stream
+        i = bisect.bisect_right(starts, lo) - 1
+        parts = []
+        while lo < hi:
+            end = min(hi, starts[i + 1])
+            parts.append(self._map[offsets[i] + lo - starts[i]:offsets[i] + end - starts[i]])
+            lo = end
+            i += 1
+        return b"".join(parts)
+
+    def _find(self, delim, lo, hi):
+        """Position of ``delim`` in the replies between ``lo`` and ``hi``, or -1."""
+        starts, offsets = self._received
+        i = bisect.bisect_right(starts, lo) - 1
+        while i + 1 < len(starts) and starts[i] < hi:
+            first, last = max(lo, starts[i]), min(hi, starts[i + 1])
+            if first > lo and len(delim) > 1:
+                # a match running over from the previous record
+                seam = max(lo, first - len(delim) + 1)
+                at = self._slice(self._received, seam, min(hi, first + len(delim) - 1)).find(delim)
+                if at >= 0:
+                    return seam + at
+            at = self._map.find(delim, offsets[i] + first - starts[i], offsets[i] + last - starts[i])
+            if at >= 0:
+                return starts[i] + at - offsets[i]
+            i += 1
+        return -1
+
+    def _available(self):
+        i = bisect.bisect_right(self._required, self.sent)
+        return self._ends[i - 1] if i else 0
+
+    def _starved(self, wanted):
+        if self._limit == self._received[0][-1]:
+            return EOFError(f"transcript ends at byte {self.pos}")
+        return TranscriptMismatch(
+            f"solver waits for {wanted} at reply byte {self.pos}, but the server"
+            f" sent nothing more until it had read {self._required[bisect.bisect_right(self._ends, self._limit)]}"
+            f" bytes (solver sent {self.sent})"
+        )
+
+    def send(self, data):
+        data = _bytes(data)
+        end = min(self.sent + len(data), self._sent[0][-1])
+        if self._slice(self._sent, self.sent, end) != data:
+            expected = self._slice(self._sent, self.sent, min(self.sent + max(len(data), 16), self._sent[0][-1]))
+            raise TranscriptMismatch(f"send at byte {self.sent}: recorded {expected[:80]!r}, got {data[:80]!r}")
+        self.sent += len(data)
+        self._limit = self._available()
+
+    def sendline(self, data=b""):
+        self.send(_bytes(data) + b"\n")
+
+    def _take(self, end):
+        data = self._slice(self._received, self.pos, end)
+        self.pos = end
+        return data
+
+    def recv(self, numb=4096):
+        if self.pos == self._limit:
+            raise self._starved("any bytes")
+        return self._take(min(self.pos + numb, self._limit))
+
+    def recvn(self, numb):
+        if self.pos + numb > self._limit:
+            raise self._starved(f"{numb} bytes")
+        return self._take(self.pos + numb)
+
+    def recvuntil(self, delim, drop=False):
+        delim = _bytes(delim)
+        end = self._find(delim, self.pos, self._limit)
+        if end < 0:
+            raise self._starved(repr(delim))
+        data = self._take(end + len(delim))
+        return data[:-len(delim)] if drop else data
+
+    def recvline(self, keepends=True):
+        return self.recvuntil(b"\n", drop=not keepends)
+
+    def recvall(self):
+        return self._take(self._limit)
+
+    def sendafter(self, delim, data):
+        received = self.recvuntil(delim)
+        self.send(data)
+        return received
+
+    def sendlineafter(self, delim, data):
+        received = self.recvuntil(delim)
+        self.sendline(data)
+        return received
+
+    def close(self):
+        if not self._map.closed:
+            self._map.close()
+
+
+def process(argv, **kwargs):
+    """A pwntools ``process`` for ``argv``, recorded or replayed as the environment says."""
+    replay = os.environ.get(REPLAY_ENV)
+    if replay:
+        return Replay(replay)
+    from pwnlib.tubes.process import process as pwn_process
+
+    io = pwn_process(argv, **kwargs)
+    path = os.environ.get(RECORD_ENV)
+    if path:
+        record(io, path)
+    return io
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--dump", action="store_true", help="print every record")
+    parser.add_argument("--width", type=int, default=100, help="bytes of each record to show with --dump")
+    args = parser.parse_args()
+
+    totals = {True: [0, 0], False: [0, 0]}
+    with open(args.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for sent, payload in records(mapped):
+            totals[sent][0] += 1
+            totals[sent][1] += len(payload)
+            if args.dump:
+                text = bytes(payload[:args.width])
+                print(f"{'>' if sent else '<'} {len(payload):>8}  {text!r}{'...' if len(payload) > args.width else ''}")
+            payload.release()
+    print(
+        f"{args.path}: {os.path.getsize(args.path)} bytes; solver sent {totals[True][1]} bytes"
+        f" in {totals[True][0]} records, server sent {totals[False][1]} bytes in {totals[False][0]} records"
+    )
+
+
+if __name__ == "__main__":
+    main()
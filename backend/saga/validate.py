@@ -0,0 +1,251 @@
+"""Check that generated static instances are solvable, in parallel.
+
+    python -m saga.validate [lampent bagon ...] -n 1000 --out validate.json
+    python -m saga.validate --instances ../instances [--prune]
+
+Every static challenge's ``solve.py`` exposes ``solve(instance) -> flag``:
+``instance`` is the text of an ``output.txt`` and the result is the flag
+as bytes.  The validator imports each solver once per worker, feeds it
+instances across a process pool and compares the result with
+``flag.txt``.  Instances are either generated on the fly, ``-n`` per
+challenge with :func:`saga.instances.generate`, or read from the ready
+reservoir that ``saga.instances`` keeps, without claiming them; with
+``--prune`` the ones that fail are removed from it.
+
+With ``--seed``, instance ``i`` of a challenge is generated under
+:func:`saga.bench.seed_process` keyed on the seed, the challenge and
+``i``, so a failure in the report can be regenerated exactly.  Each
+instance gets ``--timeout`` seconds; a solver that runs longer counts as
+a failure.  The report has one record per instance (source, solved,
+generation and solve seconds, error) and per-challenge throughput and
+solve-time percentiles.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import signal
+import statistics
+import sys
+import time
+from multiprocessing import Pool
+
+from saga import bench, instances
+from saga.session import CHALLENGES_DIR
+
+_solvers = {}
+
+
+class SolveTimeout(Exception):
+    pass
+
+
+def solvable_challenges(challenges_dir=CHALLENGES_DIR):
+    """Static challenges whose ``solve.py`` has a ``solve`` function."""
+    names = []
+    for name in instances.static_challenges(challenges_dir):
+        path = os.path.join(challenges_dir, name, "solve.py")
+        if os.path.exists(path) and "\ndef solve(" in open(path).read():
+            names.append(name)
+    return names
+
+
+def load_solver(name, challenges_dir=CHALLENGES_DIR):
+    """The ``solve`` function of ``<name>/solve.py``, imported once per process."""
+    key = (name, challenges_dir)
+    if key not in _solvers:
+        path = os.path.join(challenges_dir, name, "solve.py")
+        spec = importlib.util.spec_from_file_location(f"saga_solve_{name}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _solvers[key] = module.solve
+    return _solvers[key]
+
+
+def read_flag(name, challenges_dir=CHALLENGES_DIR):
+    with open(os.path.join(challenges_dir, name, "flag.txt"), "rb") as f:
+        return f.read().strip()
+
+
+def _alarm(signum, frame):
+    raise SolveTimeout("solver ran out of time")
+
+
+def check(name, instance, challenges_dir=CHALLENGES_DIR, timeout=None):
+    """Solve one instance; returns (solved, seconds, error)."""
+    solve = load_solver(name, challenges_dir)
+    if timeout:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        flag = solve(instance)
+    except Exception as err:
+        return False, time.perf_counter() - start, f"{type(err).__name__}: {err}"
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    elapsed = time.perf_counter() - start
+    if isinstance(flag, str):
+        flag = flag.encode()
+    if flag.strip() != read_flag(name, challenges_dir):
+        return False, elapsed, f"wrong flag {flag[:64]!r}"
+    return True, elapsed, None
+
+
+def _task(args):
+    name, source, challenges_dir, seed, timeout = args
+    record = {"name": name, "source": source}
+    if isinstance(source, int):
+        if seed is not None:
+            bench.seed_process(seed, f"{name}:{source}")
+        start = time.perf_counter()
+        try:
+            instance = instances.generate(name, challenges_dir)
+        except Exception as err:
+            record.update(solved=False, error=f"generation failed: {type(err).__name__}: {err}")
+            return record
+        record["generate_s"] = time.perf_counter() - start
+    else:
+        with open(source) as f:
+            instance = f.read()
+    solved, record["solve_s"], error = check(name, instance, challenges_dir, timeout)
+    record["solved"] = solved
+    if error:
+        record["error"] = error
+        if isinstance(source, int):
+            record["instance"] = instance
+    return record
+
+
+def _interleave(per_name):
+    """Round-robin over the task lists of every challenge."""
+    tasks = []
+    for i in range(max(map(len, per_name.values()), default=0)):
+        tasks.extend(queue[i] for queue in per_name.values() if i < len(queue))
+    return tasks
+
+
+def generated_tasks(names, count, challenges_dir=CHALLENGES_DIR, seed=None, timeout=None):
+    return _interleave({
+        name: [(name, i, challenges_dir, seed, timeout) for i in range(count)] for name in names
+    })
+
+
+def reservoir_tasks(names, instances_dir=instances.INSTANCES_DIR, challenges_dir=CHALLENGES_DIR, timeout=None):
+    per_name = {}
+    for name in names:
+        ready = os.path.join(instances_dir, name, "ready")
+        try:
+            files = sorted(os.listdir(ready))
+        except FileNotFoundError:
+            files = []
+        per_name[name] = [(name, os.path.join(ready, f), challenges_dir, None, timeout) for f in files]
+    return _interleave(per_name)
+
+
+def validate(tasks, processes=None, progress=None):
+    """Run ``tasks`` over a process pool; returns (records, wall seconds).
+
+    ``progress`` is called with every record as it comes in.
+    """
+    records = []
+    start = time.perf_counter()
+    with Pool(processes) as pool:
+        for record in pool.imap_unordered(_task, tasks):
+            records.append(record)
+            if progress is not None:
+                progress(record)
+    return records, time.perf_counter() - start
+
+
+def _quantile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(records, wall):
+    """Per-challenge counts, throughput and solve-time percentiles."""
+    summary = {}
+    for name in dict.fromkeys(r["name"] for r in records):
+        runs = [r for r in records if r["name"] == name]
+        times = [r["solve_s"] for r in runs if "solve_s" in r]
+        entry = {
+            "instances": len(runs),
+            "solved": sum(r["solved"] for r in runs),
+            "failed": sum(not r["solved"] for r in runs),
+            "solve_total_s": sum(times),
+        }
+        if times:
+            entry.update({
+                "solve_mean_s": statistics.fmean(times),
+                "solve_p50_s": _quantile(times, 0.5),
+                "solve_p90_s": _quantile(times, 0.9),
+                "solve_max_s": max(times),
+            })
+        generated = [r["generate_s"] for r in runs if "generate_s" in r]
+        if generated:
+            entry["generate_mean_s"] = statistics.fmean(generated)
+        summary[name] = entry
+    return {
+        "wall_s": wall,
+        "instances": len(records),
+        "failed": sum(not r["solved"] for r in records),
+        "instances_per_s": len(records) / wall if wall else None,
+        "challenges": summary,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="challenges to validate (default: every static challenge with a solve())")
+    parser.add_argument("-n", "--count", type=int, default=16, help="instances to generate per challenge")
+    parser.add_argument("--instances", metavar="DIR", help="validate the ready reservoir in DIR instead of generating")
+    parser.add_argument("--prune", action="store_true", help="with --instances, delete the instances that fail")
+    parser.add_argument("--seed", type=int, help="generate reproducible instances")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=300, help="seconds per solve, 0 for none")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--challenges", default=CHALLENGES_DIR)
+    args = parser.parse_args()
+    if args.prune and not args.instances:
+        parser.error("--prune needs --instances")
+
+    names = args.names or solvable_challenges(args.challenges)
+    if args.instances:
+        tasks = reservoir_tasks(names, args.instances, args.challenges, args.timeout)
+    else:
+        tasks = generated_tasks(names, args.count, args.challenges, args.seed, args.timeout)
+
+    def progress(record):
+        if not record["solved"]:
+            print(f"{record['name']} {record['source']}: {record['error']}", file=sys.stderr)
+
+    records, wall = validate(tasks, args.processes, progress)
+    summary = summarize(records, wall)
+    for name, entry in summary["challenges"].items():
+        timing = f", solve p50 {entry['solve_p50_s']:.3f}s p90 {entry['solve_p90_s']:.3f}s" if "solve_p50_s" in entry else ""
+        print(f"{name}: {entry['solved']}/{entry['instances']} solved{timing}", file=sys.stderr)
+    print(f"{summary['instances']} instances in {wall:.1f}s ({summary['instances_per_s'] or 0:.1f}/s), {summary['failed']} failed", file=sys.stderr)
+
+    if args.prune:
+        for record in records:
+            if not record["solved"]:
+                try:
+                    os.unlink(record["source"])
+                except FileNotFoundError:
+                    pass
+
+    report = {"seed": args.seed, "summary": summary, "results": records}
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Pre-forking server: import a challenge once, fork a child per connection.
+
+    python -m saga.zygote empoleon --port 1338
+    python -m saga.zygote empoleon --compare 20
+
+The parent imports the challenge module (and with it ``ecdsa``,
+``Crypto.Util.number`` and any curve objects built at module level) before
+it starts accepting, so every forked child shares those pages copy-on-write
+and starts its session without interpreter or import startup.  Each child
+writes one JSON line of stats (time to first byte, RSS, PSS and private
+memory at that point) to ``--stats``.  ``--compare N`` measures N sessions
+against the zygote and N runs of plain ``python3 chall.py`` side by side.
+
+The ``random`` module reseeds itself in forked children; the challenges
+draw their secrets from ``os.urandom`` otherwise, so no per-child state
+leaks between sessions.
+
+Children run under the challenge's :mod:`saga.governor` limits, with the
+idle limit as their socket timeout and the CPU limit as ``RLIMIT_CPU``.
+The parent admits connections per source address and, on each accept,
+reaps the children that have exited to count their sources down.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import traceback
+
+from saga import governor, metrics
+from saga.host import listen
+from saga.session import CHALLENGES_DIR, FileSession, load_challenge, run_blocking
+
+
+def memory_kb(pid="self"):
+    """Return RSS, PSS and private memory of ``pid`` in kB."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if rest.strip().endswith("kB"):
+                    fields[key] = int(rest.split()[0])
+    except OSError:
+        return {}
+    return {
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "private_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+class _TimedWriter:
+    """Write-through wrapper that records when the first byte goes out."""
+
+    def __init__(self, wfile, accepted, report):
+        self.wfile = wfile
+        self.accepted = accepted
+        self.report = report
+        self.pending = False
+
+    def write(self, data):
+        self.pending = self.pending or bool(data)
+        return self.wfile.write(data)
+
+    def flush(self):
+        self.wfile.flush()
+        if self.pending and self.report:
+            stats = {"ttfb_ms": (time.perf_counter() - self.accepted) * 1000}
+            stats.update(memory_kb())
+            self.report(stats)
+            self.report = None
+
+
+def run_child(session, conn, accepted, challenge, stats, limits=governor.DEFAULT):
+    def report(entry):
+        if stats is not None:
+            entry = {"pid": os.getpid(), "challenge": challenge, **entry}
+            stats.write(json.dumps(entry) + "\n")
+            stats.flush()
+
+    conn.settimeout(limits.idle_s)
+    governor.cap_process_cpu(limits)
+    rfile = conn.makefile("rb")
+    wfile = _TimedWriter(conn.makefile("wb"), accepted, report)
+    io = metrics.MeteredIO(FileSession(rfile, wfile))
+    try:
+        run_blocking(session, governor.GovernedIO(io, limits))
+        wfile.flush()
+    except (EOFError, ConnectionError, TimeoutError):
+        pass
+    finally:
+        io.close()
+        conn.close()
+
+
+def reap(children, limiter):
+    """Wait for the children that have exited and free their sources' slots."""
+    while children:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if not pid:
+            return
+        if pid in children:
+            limiter.release(children.pop(pid))
+
+
+def serve(module, challenge, sock, stats):
+    limits = governor.limits_of(module.session)
+    limiter = governor.SourceLimiter(limits)
+    children = {}
+    # reaped synchronously before each admission; a SIGCHLD handler would
+    # run late whenever the signal lands on one of the metrics threads
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    # each child hands its session's metrics back to the parent as one datagram
+    collector, reporter = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    metrics.collect(collector)
+    while True:
+        conn, addr = sock.accept()
+        accepted = time.perf_counter()
+        reap(children, limiter)
+        source = addr[0] if isinstance(addr, tuple) else "local"
+        refused = limiter.admit(source)
+        if refused:
+            try:
+                conn.sendall(f"Too many sessions from {source}: {refused}.\n".encode())
+            except OSError:
+                pass
+            conn.close()
+            continue
+        pid = os.fork()
+        if pid == 0:
+            sock.close()
+            metrics.reset()
+            status = 0
+            try:
+                run_child(module.session, conn, accepted, challenge, stats, limits)
+            except Exception:
+                traceback.print_exc()
+                status = 1
+            try:
+                reporter.send(json.dumps(metrics.snapshot()).encode())
+            except OSError:
+                pass
+            os._exit(status)
+        children[pid] = source
+        conn.close()
+
+
+def first_byte(argv, cwd):
+    start = time.perf_counter()
+    proc = subprocess.Popen(argv, cwd=cwd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    proc.stdout.read(1)
+    entry = {"ttfb_ms": (time.perf_counter() - start) * 1000}
+    entry.update(memory_kb(proc.pid))
+    proc.kill()
+    proc.wait()
+    return entry
+
+
+def compare(module, challenge, rounds):
+    sock = listen("127.0.0.1", 0)
+    port = sock.getsockname()[1]
+    read_fd, write_fd = os.pipe()
+    server = os.fork()
+    if server == 0:
+        os.close(read_fd)
+        try:
+            serve(module, challenge, sock, os.fdopen(write_fd, "w"))
+        finally:
+            os._exit(1)
+    os.close(write_fd)
+    sock.close()
+
+    stats = os.fdopen(read_fd)
+    zygote = []
+    for _ in range(rounds):
+        conn = socket.create_connection(("127.0.0.1", port))
+        conn.recv(1)
+        zygote.append(json.loads(stats.readline()))
+        conn.close()
+    os.kill(server, signal.SIGTERM)
+    os.waitpid(server, 0)
+
+    cwd = os.getcwd()
+    plain = [first_byte([sys.executable, "chall.py"], cwd) for _ in range(rounds)]
+
+    print(f"{challenge}: median over {rounds} sessions")
+    print(f"{'':10}{'ttfb_ms':>10}{'rss_kb':>10}{'pss_kb':>10}{'private_kb':>12}")
+    for name, rows in (("zygote", zygote), ("python3", plain)):
+        cols = [statistics.median(r.get(k, 0) for r in rows) for k in ("ttfb_ms", "rss_kb", "pss_kb", "private_kb")]
+        print(f"{name:10}{cols[0]:>10.2f}{cols[1]:>10.0f}{cols[2]:>10.0f}{cols[3]:>12.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("challenge")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=1338)
+    parser.add_argument("--stats", help="append per-session JSON stats to this file (default: stderr)")
+    parser.add_argument("--compare", type=int, metavar="N", help="compare N sessions against plain python3 chall.py")
+    parser.add_argument("--challenges", default=CHALLENGES_DIR)
+    metrics.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    module = load_challenge(args.challenge, args.challenges)
+    if args.compare:
+        compare(module, args.challenge, args.compare)
+        return
+
+    stats = open(args.stats, "a") if args.stats else sys.stderr
+    sock = listen(args.host, args.port)
+    metrics.export_from_args(args)
+    print(f"[{os.getpid()}] zygote serving {args.challenge} on {args.host}:{args.port}", file=sys.stderr)
+    try:
+        serve(module, args.challenge, sock, stats)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
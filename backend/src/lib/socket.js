@@ -3,6 +3,9 @@ import http from 'http';
 import express from 'express';
 import fs from 'fs/promises';
 import path from 'path';
+import crypto from 'crypto';
+import { execFile, spawn } from 'child_process';
+import { promisify } from 'util';
 import { v2 as cloudinary } from 'cloudinary';
 import dotenv from 'dotenv';
 
@@ -25,6 +28,9 @@ const activeMatches = {};
 const matchChallenges = {};
 
 const CHALLENGES_BASE_PATH = path.join(process.cwd(), 'challenges');
+const CATALOG_PATH = path.join(CHALLENGES_BASE_PATH, 'catalog.json');
+const INSTANCES_BASE_PATH = path.join(process.cwd(), 'instances');
+const execFileAsync = promisify(execFile);
 
 const io = new Server(server, {
     cors: {
@@ -36,54 +42,120 @@ export function getReceiverSocketId(userId) {
     return userSocketMap[userId];
 }
 
-async function getLocalChallengeDetails() {
+// The catalog (saga/catalog.py) indexes every challenge's trailer metadata,
+// player files and flag digest. It is rebuilt incrementally once at startup
+// and then kept in memory, so matchmaking never touches the filesystem.
+async function loadChallengeCatalog() {
     try {
-        const challengeDirs = await fs.readdir(CHALLENGES_BASE_PATH, { withFileTypes: true });
-        const directories = challengeDirs.filter(dirent => dirent.isDirectory()).map(dirent => dirent.name);
+        await execFileAsync(process.env.PYTHON || 'python3', ['-m', 'saga.catalog', '--challenges', CHALLENGES_BASE_PATH], {
+            cwd: path.dirname(CHALLENGES_BASE_PATH),
+        });
+        const catalog = JSON.parse(await fs.readFile(CATALOG_PATH, 'utf8'));
+        console.log(`Challenge catalog: ${Object.keys(catalog.challenges).length} challenges indexed.`);
+        return catalog;
+    } catch (error) {
+        console.error('Error building challenge catalog:', error.message);
+        return null;
+    }
+}
 
-        if (directories.length === 0) {
-            console.error('No challenge directories found in:', CHALLENGES_BASE_PATH);
-            return null;
-        }
+const challengeCatalog = loadChallengeCatalog();
+
+// saga/instances.py keeps a reservoir of freshly generated output.txt files
+// for the static challenges, so each match gets its own instance without
+// waiting on prime generation.
+function startInstanceGenerator() {
+    const generator = spawn(process.env.PYTHON || 'python3', ['-m', 'saga.instances', '--challenges', CHALLENGES_BASE_PATH, '--instances', INSTANCES_BASE_PATH], {
+        cwd: path.dirname(CHALLENGES_BASE_PATH),
+        stdio: 'inherit',
+    });
+    generator.on('error', error => console.error('Instance generator failed to start:', error.message));
+    generator.on('exit', code => console.warn(`Instance generator exited with code ${code}.`));
+    process.on('exit', () => generator.kill());
+}
 
-        const randomDirName = directories[Math.floor(Math.random() * directories.length)];
-        const challengePath = path.join(CHALLENGES_BASE_PATH, randomDirName);
+startInstanceGenerator();
 
-        let flagTxt;
+// Claims one ready instance by renaming it out of the reservoir, so every
+// instance goes to exactly one match. The caller deletes it after uploading.
+async function takeInstance(challengeName) {
+    const readyPath = path.join(INSTANCES_BASE_PATH, challengeName, 'ready');
+    const claimedPath = path.join(INSTANCES_BASE_PATH, challengeName, 'claimed');
+    let ready;
+    try {
+        ready = await fs.readdir(readyPath);
+        await fs.mkdir(claimedPath, { recursive: true });
+    } catch {
+        return null;
+    }
+    for (const fileName of ready) {
+        const target = path.join(claimedPath, fileName);
         try {
-            flagTxt = await fs.readFile(path.join(challengePath, 'flag.txt'), 'utf8');
-        } catch (readError) {
-            console.error(`Error reading flag.txt from ${path.join(challengePath, 'flag.txt')}:`, readError.message);
-            return null;
+            await fs.rename(path.join(readyPath, fileName), target);
+            return target;
+        } catch {
+            continue;
         }
+    }
+    return null;
+}
 
-        const filesInChallenge = await fs.readdir(challengePath, { withFileTypes: true });
-        const relevantLocalFiles = filesInChallenge
-            .filter(dirent => dirent.isFile())
-            .map(dirent => dirent.name)
-            .filter(name => name !== 'flag.txt' && !name.startsWith('solve.'));
-
-        console.log(`Selected local challenge: ${randomDirName}`);
-        console.log(`Correct Flag (for selected challenge): ${flagTxt.trim()}`);
-        console.log(`Relevant local challenge files:`, relevantLocalFiles);
-
-        return {
-            name: randomDirName,
-            flag: flagTxt.trim(),
-            localChallengeFiles: relevantLocalFiles,
-        };
-    } catch (error) {
-        console.error('Error fetching random local challenge details:', error);
+function flagDigest(flag) {
+    return crypto.createHash('sha256').update(flag, 'utf8').digest('hex');
+}
+
+async function getLocalChallengeDetails({ tags = [], kind } = {}) {
+    const catalog = await challengeCatalog;
+    if (!catalog) {
+        return null;
+    }
+
+    let names = Object.keys(catalog.challenges);
+    for (const tag of tags) {
+        const tagged = new Set(catalog.tags[tag] || []);
+        names = names.filter(name => tagged.has(name));
+    }
+    if (kind) {
+        names = names.filter(name => catalog.challenges[name].kind === kind);
+    }
+
+    if (names.length === 0) {
+        console.error('No challenges in the catalog match:', { tags, kind });
         return null;
     }
+
+    const challenge = catalog.challenges[names[Math.floor(Math.random() * names.length)]];
+    const relevantLocalFiles = challenge.files.map(file => file.name);
+
+    const fileOverrides = {};
+    if (challenge.kind === 'static' && relevantLocalFiles.includes('output.txt')) {
+        const instancePath = await takeInstance(challenge.name);
+        if (instancePath) {
+            fileOverrides['output.txt'] = instancePath;
+        } else {
+            console.warn(`No fresh instance ready for ${challenge.name}; serving the committed output.txt.`);
+        }
+    }
+
+    console.log(`Selected local challenge: ${challenge.name} (${challenge.kind})`);
+    console.log(`Relevant local challenge files:`, relevantLocalFiles);
+
+    return {
+        name: challenge.name,
+        kind: challenge.kind,
+        tags: challenge.tags,
+        flagDigest: challenge.flag.sha256,
+        localChallengeFiles: relevantLocalFiles,
+        fileOverrides,
+    };
 }
 
-async function uploadFilesToCloudinary(challengeDirName, localFileNames, matchId) {
+async function uploadFilesToCloudinary(challengeDirName, localFileNames, matchId, fileOverrides = {}) {
     const uploadedFileDetails = [];
     const challengeSourcePath = path.join(CHALLENGES_BASE_PATH, challengeDirName);
 
     for (const fileName of localFileNames) {
-        const localFilePath = path.join(challengeSourcePath, fileName);
+        const localFilePath = fileOverrides[fileName] || path.join(challengeSourcePath, fileName);
         try {
             const safeFileNameForPublicId = fileName.replace(/[^a-zA-Z0-9_.-]/g, '_');
             const result = await cloudinary.uploader.upload(localFilePath, {
@@ -216,8 +288,12 @@ matchIo.on('connection', (socket) => {
                     uploadedChallengeFiles = await uploadFilesToCloudinary(
                         localChallenge.name,
                         localChallenge.localChallengeFiles,
-                        matchId
+                        matchId,
+                        localChallenge.fileOverrides
                     );
+                    for (const instancePath of Object.values(localChallenge.fileOverrides)) {
+                        fs.unlink(instancePath).catch(() => {});
+                    }
 
                     const failedUploads = uploadedChallengeFiles.filter(f => !f.url);
                     if (failedUploads.length > 0) {
@@ -237,7 +313,7 @@ matchIo.on('connection', (socket) => {
                 activeMatches[matchId] = { player1, player2 };
                 matchChallenges[matchId] = {
                     name: localChallenge.name,
-                    flag: localChallenge.flag,
+                    flagDigest: localChallenge.flagDigest,
                     challengeFileDetails: uploadedChallengeFiles,
                 };
 
@@ -311,7 +387,7 @@ matchIo.on('connection', (socket) => {
             return;
         }
 
-        if (submittedFlag.trim() === challengeInfo.flag) {
+        if (flagDigest(submittedFlag.trim()) === challengeInfo.flagDigest) {
             console.log(`Flag Submission: Correct flag submitted by ${currentUsername} (${currentUserId}) for match ${matchId}!`);
 
             const winner = (currentUserId === matchInfo.player1.userId) ? matchInfo.player1 : matchInfo.player2;